@@ -0,0 +1,124 @@
+# =======================
+# SERPICKS – BACKTEST
+# =======================
+# Uso:
+#   python backtest.py [--sport football|mlb|...|all] [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--workers N] [--json]
+#       -> reproduce la lógica de picks sobre el histórico local (sin red) y
+#          reporta ROI / CLV por mercado y por etiqueta de edge, más fixtures/seg.
+#   python backtest.py fetch-results --days 7
+#       -> (con red) guarda los marcadores finales de los últimos N días en el histórico.
+import argparse, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import history, sports
+from odds import OddsIndex
+from settlement import settle, profit
+
+def _replay(job):
+    """Un slate (deporte, día) -> (n_fixtures, [(deporte, mercado, etiqueta, ganancia, clv)])."""
+    sport, day = job
+    rows = history.load_slate(sport, day)
+    picks_lists = sports.get(sport).model([(r[0], r[1]) for r in rows], point_in_time=True)
+
+    bets = []
+    for (_, _, closing, hs, as_), picks in zip(rows, picks_lists):
+        if hs is None or as_ is None:
+            continue
+        close_idx = OddsIndex(closing)
+        for p in picks:
+            res = settle(p.get("market"), p.get("outcome"), hs, as_)
+            if res is None or not p.get("odds_dec"):
+                continue
+            close = close_idx.price(p["market"], p["outcome"])
+            clv = p["odds_dec"] / close - 1.0 if close else None
+            bets.append((sport, p["market"], p.get("edge_label", ""), profit(res, p["odds_dec"]), clv))
+    return len(rows), bets
+
+def _aggregate(bets, key):
+    out = {}
+    for b in bets:
+        k = key(b)
+        a = out.setdefault(k, {"bets": 0, "profit": 0.0, "clv_sum": 0.0, "clv_n": 0})
+        a["bets"] += 1
+        a["profit"] += b[3]
+        if b[4] is not None:
+            a["clv_sum"] += b[4]
+            a["clv_n"] += 1
+    for a in out.values():
+        a["roi"] = a["profit"] / a["bets"] if a["bets"] else 0.0
+        a["clv"] = a["clv_sum"] / a["clv_n"] if a["clv_n"] else None
+    return out
+
+def run_backtest(keys, since=None, until=None, workers=None):
+    jobs = [(s, d) for s in keys for d in history.days(s, since, until)]
+    start = time.perf_counter()
+    n_fixtures, bets = 0, []
+    if jobs:
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_replay, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+        else:
+            results = [_replay(j) for j in jobs]
+        for n, b in results:
+            n_fixtures += n
+            bets.extend(b)
+    elapsed = time.perf_counter() - start
+    return {
+        "slates": len(jobs), "fixtures": n_fixtures, "bets": len(bets),
+        "seconds": elapsed, "fixtures_per_sec": n_fixtures / elapsed if elapsed > 0 else 0.0,
+        "by_market": _aggregate(bets, lambda b: f"{b[0]} | {b[1]}"),
+        "by_edge_label": _aggregate(bets, lambda b: f"{b[0]} | {b[2]}"),
+        "total": _aggregate(bets, lambda b: "total").get("total"),
+    }
+
+def _fmt_table(title, agg):
+    lines = [title]
+    for k in sorted(agg):
+        a = agg[k]
+        clv = f"{a['clv']*100:+.2f}%" if a["clv"] is not None else "N/A"
+        lines.append(f"  {k:<40} apuestas {a['bets']:>6}  ROI {a['roi']*100:+6.2f}%  CLV {clv}")
+    return "\n".join(lines)
+
+def format_report(rep):
+    head = (f"Slates: {rep['slates']}  Fixtures: {rep['fixtures']}  Picks liquidados: {rep['bets']}\n"
+            f"Tiempo: {rep['seconds']:.2f}s  ({rep['fixtures_per_sec']:.0f} fixtures/seg)")
+    return "\n".join([head, _fmt_table("Por mercado:", rep["by_market"]),
+                      _fmt_table("Por etiqueta de edge:", rep["by_edge_label"])])
+
+def fetch_results(days_back):
+    """Guarda marcadores finales de los últimos `days_back` días (usa la API)."""
+    from utils import as_date, local_tz
+    today = as_date(None, local_tz())
+    n = 0
+    for i in range(1, days_back + 1):
+        day = today - timedelta(days=i)
+        for p in sports.enabled():
+            try:
+                for item in p.fetch(day):
+                    score = p.result(item)
+                    if score is not None:
+                        history.record_result(p.key, p.item_id(item), *score)
+                        n += 1
+            except Exception as e:
+                print(f"WARN resultados {p.name}:", e, file=sys.stderr)
+    return n
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Backtest offline de SERPICKS")
+    ap.add_argument("command", nargs="?", default="run", choices=["run", "fetch-results"])
+    ap.add_argument("--sport", default="all", choices=sports.keys() + ["all"])
+    ap.add_argument("--from", dest="since")
+    ap.add_argument("--to", dest="until")
+    ap.add_argument("--workers", type=int)
+    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    if args.command == "fetch-results":
+        print(f"Resultados guardados: {fetch_results(args.days)}")
+    else:
+        keys = sports.keys() if args.sport == "all" else [args.sport]
+        rep = run_backtest(keys, args.since, args.until, args.workers)
+        print(json.dumps(rep, indent=2, default=str) if args.json else format_report(rep))
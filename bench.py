@@ -0,0 +1,205 @@
+# =======================
+# SERPICKS – BENCHMARKS
+# =======================
+# Uso:
+#   python bench.py [--sizes 10,50,100,250,500] [--latency-ms 40] [--error-rate 0.0]
+#                   [--rps 0] [--baseline bench_baseline.json] [--save-baseline] [--tolerance 0.25]
+# Cada tamaño corre en un proceso aparte contra el stand-in local (SERPICKS_HTTP_MODE=replay):
+# respuestas grabadas en SERPICKS_RECORD_DIR o, si no hay, un slate sintético de N partidos.
+# Mide tiempo, peticiones y pico de memoria de cada módulo deportivo, gather_picks_for,
+# build_message_for y send_to_telegram. Con --baseline falla (exit 1) si algo empeora.
+# El límite por host de RapidAPI va apagado (--rps 0) para medir el código y no el sleep
+# del limitador; --rps N lo activa para reproducir producción.
+import argparse, json, os, random, shutil, subprocess, sys, tempfile, time, tracemalloc
+from datetime import date, timedelta
+
+LEAGUES = [("Premier League", 39), ("La Liga", 140), ("Bundesliga", 78), ("Serie A", 135),
+           ("Ligue 1", 61), ("Liga MX", 262), ("Eredivisie", 88), ("UEFA Champions League", 2),
+           ("Leagues Cup", 772)]
+SEASON = 2026
+PAGE = 10
+
+def _odds_item(key, oid, rnd, football):
+    vals = lambda names: [{"value": n, "odd": f"{rnd.uniform(1.3, 4.5):.2f}"} for n in names]
+    if football:
+        bets = [{"name": "Match Winner", "values": vals(["Home", "Draw", "Away"])},
+                {"name": "Double Chance", "values": vals(["1X", "12", "X2"])},
+                {"name": "Goals Over/Under", "values": vals(["Over 2.5", "Under 2.5", "Over 3.0", "Under 3.0"])},
+                {"name": "Both Teams Score", "values": vals(["Yes", "No"])}]
+    else:
+        bets = [{"name": "Moneyline", "values": vals(["Home", "Away"])},
+                {"name": "Spread", "values": vals(["Home -1.5", "Away -1.5"])},
+                {"name": "Totals", "values": vals(["Over 7.5", "Under 7.5", "Over 8.5", "Under 8.5"])}]
+    return {key: {"id": oid}, "update": "2026-01-01T00:00:00+00:00",
+            "bookmakers": [{"id": 8, "name": "Pinnacle", "bets": bets}]}
+
+def _result(fix, k):
+    """Partido terminado sintético entre los equipos de `fix`, k+1 semanas antes."""
+    rnd = random.Random(fix["fixture"]["id"] * 10 + k)
+    d = date.fromisoformat(fix["fixture"]["date"][:10]) - timedelta(days=7 * (k + 1))
+    return {"fixture": {"id": fix["fixture"]["id"] * 10 + k, "date": f"{d.isoformat()}T18:00:00+00:00",
+                        "status": {"short": "FT"}},
+            "league": fix["league"], "teams": fix["teams"],
+            "goals": {"home": rnd.randint(0, 4), "away": rnd.randint(0, 3)}}
+
+def synthetic_slate(n_football, n_mlb, day):
+    """Fallback del stand-in: slate sintético determinista de n partidos para `day` (UTC)."""
+    iso = day.isoformat()
+    fixtures = []
+    for i in range(n_football):
+        name, lid = LEAGUES[i % len(LEAGUES)]
+        fixtures.append({
+            "fixture": {"id": 10_000 + i, "date": f"{iso}T{12 + i % 10:02d}:00:00+00:00",
+                        "status": {"short": "NS"}},
+            "league": {"id": lid, "name": name, "season": SEASON},
+            "teams": {"home": {"id": 2 * i + 1, "name": f"Local {i}"}, "away": {"id": 2 * i + 2, "name": f"Visita {i}"}},
+            "goals": {"home": None, "away": None},
+        })
+    games = [{"id": 50_000 + i, "date": f"{iso}T{17 + i % 6:02d}:05:00+00:00",
+              "league": {"id": 1, "season": SEASON},
+              "teams": {"home": {"id": 900 + 2 * i, "name": f"MLB Local {i}"},
+                        "away": {"id": 901 + 2 * i, "name": f"MLB Visita {i}"}}} for i in range(n_mlb)]
+
+    def fallback(method, url, params, body):
+        params = params or {}
+        path = url.split("?")[0]
+        if path.endswith("/v3/leagues"):
+            return {"response": [{"league": {"id": int(params.get("id", 0))},
+                                  "seasons": [{"year": SEASON, "current": True}]}]}
+        if path.endswith("/v3/fixtures"):
+            if "date" in params:
+                return {"response": fixtures if params["date"] == iso else []}
+            if "league" in params and "status" in params:  # resultados recientes de la liga (forma)
+                lid = int(params["league"])
+                return {"response": [_result(f, k) for f in fixtures if f["league"]["id"] == lid for k in range(5)]}
+            if "league" in params:                         # slate de la liga entre from y to
+                lid = int(params["league"])
+                inside = params.get("from", iso) <= iso <= params.get("to", iso)
+                return {"response": [f for f in fixtures if f["league"]["id"] == lid] if inside else []}
+            return {"response": []}
+        if path.endswith("/v3/odds"):
+            if "fixture" in params:
+                fid = int(params["fixture"])
+                return {"response": [_odds_item("fixture", fid, random.Random(fid), True)]}
+            lid = int(params.get("league", 0))
+            ids = [f["fixture"]["id"] for f in fixtures if f["league"]["id"] == lid and params.get("date") == iso]
+            page, total = int(params.get("page", 1)), max(1, -(-len(ids) // PAGE))
+            chunk = ids[(page - 1) * PAGE: page * PAGE]
+            return {"response": [_odds_item("fixture", fid, random.Random(fid), True) for fid in chunk],
+                    "paging": {"current": page, "total": total}}
+        if path.endswith("/games"):
+            return {"response": games if params.get("date") == iso else []}
+        if path.endswith("/odds"):
+            ids = [int(params["game"])] if "game" in params else [g["id"] for g in games]
+            return {"response": [_odds_item("game", gid, random.Random(gid), False) for gid in ids]}
+        return None
+    return fallback
+
+def _stage(name, fn, out, standin):
+    tracemalloc.reset_peak()
+    before = standin.total()
+    t0 = time.perf_counter()
+    result = fn()
+    out[name] = {
+        "seconds": round(time.perf_counter() - t0, 4),
+        "requests": standin.total() - before,
+        "peak_kb": round(tracemalloc.get_traced_memory()[1] / 1024, 1),
+    }
+    return result
+
+def run_one(size):
+    """Se ejecuta en un proceso hijo ya configurado (env) para el modo replay."""
+    import recorder, main, core, mlb_analysis, team_stats, cache
+    from config import CACHE_DIR, STATE_DIR
+
+    day = date.today() + timedelta(days=3)
+    standin = recorder.standin()
+    standin.fallback = synthetic_slate(size, max(1, size // 4), day)
+
+    def reset():
+        for d in (CACHE_DIR, STATE_DIR):
+            shutil.rmtree(d, ignore_errors=True)
+        team_stats._store = None
+        cache.default_cache().clear_memory()
+        main._picks_by_day.clear()
+
+    tracemalloc.start()
+    stages = {}
+    reset()
+    _stage("football", lambda: core.analyze_football_for(day), stages, standin)
+    reset()
+    _stage("mlb", lambda: mlb_analysis.analyze_mlb_for(day), stages, standin)
+    reset()
+    _stage("gather_picks_for", lambda: main.gather_picks_for(day), stages, standin)
+    msg = _stage("build_message_for", lambda: main.build_message_for(day), stages, standin)
+    _stage("send_to_telegram", lambda: main.send_to_telegram(msg), stages, standin)
+    tracemalloc.stop()
+    return {"size": size, "stages": stages}
+
+def _child(size, args):
+    tmp = tempfile.mkdtemp(prefix="serpicks-bench-")
+    env = dict(os.environ,
+               SERPICKS_HTTP_MODE="replay",
+               SERPICKS_CACHE_DIR=os.path.join(tmp, "cache"),
+               SERPICKS_STATE_DIR=os.path.join(tmp, "state"),
+               SERPICKS_REPLAY_LATENCY_MS=str(args.latency_ms),
+               SERPICKS_REPLAY_ERROR_RATE=str(args.error_rate),
+               SERPICKS_RAPIDAPI_RPS=str(args.rps),
+               TELEGRAM_BOT_TOKEN=os.getenv("TELEGRAM_BOT_TOKEN", "bench-token"),
+               TELEGRAM_CHAT_ID=os.getenv("TELEGRAM_CHAT_ID", "bench-chat"))
+    try:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--one", str(size)],
+                             env=env, capture_output=True, text=True, check=True)
+        return json.loads(out.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def compare(results, baseline, tol):
+    """Regresiones vs baseline: tiempo y memoria con tolerancia relativa; peticiones exactas."""
+    base = {r["size"]: r["stages"] for r in baseline}
+    problems = []
+    for r in results:
+        for stage, m in r["stages"].items():
+            b = base.get(r["size"], {}).get(stage)
+            if not b:
+                continue
+            if m["seconds"] > b["seconds"] * (1 + tol) + 0.05:
+                problems.append(f"{r['size']}/{stage}: tiempo {b['seconds']}s -> {m['seconds']}s")
+            if m["requests"] > b["requests"]:
+                problems.append(f"{r['size']}/{stage}: peticiones {b['requests']} -> {m['requests']}")
+            if m["peak_kb"] > b["peak_kb"] * (1 + tol) + 256:
+                problems.append(f"{r['size']}/{stage}: memoria {b['peak_kb']}KB -> {m['peak_kb']}KB")
+    return problems
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmarks de SERPICKS contra el stand-in local")
+    ap.add_argument("--one", type=int, help=argparse.SUPPRESS)
+    ap.add_argument("--sizes", default="10,50,100,250,500")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rps", type=float, default=0.0)
+    ap.add_argument("--baseline")
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args()
+
+    if args.one is not None:
+        print(json.dumps(run_one(args.one)))
+        sys.exit(0)
+
+    results = [_child(int(n), args) for n in args.sizes.split(",")]
+    for r in results:
+        for stage, m in r["stages"].items():
+            print(f"{r['size']:>5} {stage:<18} {m['seconds']:>8.3f}s {m['requests']:>5} req {m['peak_kb']:>10.1f} KB")
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print("Baseline guardado en", args.baseline)
+    elif args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            problems = compare(results, json.load(fh), args.tolerance)
+        if problems:
+            print("REGRESIONES:\n" + "\n".join(problems))
+            sys.exit(1)
+        print("Sin regresiones vs", args.baseline)
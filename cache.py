@@ -0,0 +1,83 @@
+# =======================
+# SERPICKS – CACHE
+# =======================
+import hashlib, json, os, tempfile, threading, time
+from collections import OrderedDict
+from config import CACHE_DIR, CACHE_MEM_MAX
+
+class DiskCache:
+    """
+    Caché JSON en disco, un archivo por clave. La escritura es atómica
+    (tmp + os.replace) para que dos procesos del cron no se pisen.
+    Delante hay una capa LRU en memoria (mem_max entradas) que en el modo
+    daemon evita releer y parsear el disco; los datos devueltos se comparten,
+    así que no deben modificarse.
+    """
+    def __init__(self, path=CACHE_DIR, mem_max=CACHE_MEM_MAX):
+        self.path = path
+        self.mem_max = mem_max
+        self._mem = OrderedDict()   # key -> (ts, data)
+        self._lock = threading.Lock()
+
+    def _remember(self, key, ts, data):
+        if self.mem_max <= 0:
+            return
+        with self._lock:
+            self._mem[key] = (ts, data)
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.mem_max:
+                self._mem.popitem(last=False)
+
+    @staticmethod
+    def make_key(url, params=None):
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        return url + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+    def _file(self, key):
+        return os.path.join(self.path, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def clear_memory(self):
+        with self._lock:
+            self._mem.clear()
+
+    def get(self, key, ttl):
+        """Devuelve (data, fresco) o None si no hay entrada. fresco = edad <= ttl."""
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit:
+                self._mem.move_to_end(key)
+        if hit is None:
+            try:
+                with open(self._file(key), encoding="utf-8") as fh:
+                    entry = json.load(fh)
+            except Exception:
+                return None
+            hit = (entry.get("ts", 0), entry.get("data"))
+            self._remember(key, *hit)
+        ts, data = hit
+        return data, time.time() - ts <= ttl
+
+    def get_stale(self, key, max_age):
+        hit = self.get(key, max_age)
+        if hit and hit[1]:
+            return hit[0]
+        return None
+
+    def set(self, key, data):
+        self._remember(key, time.time(), data)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump({"ts": time.time(), "key": key, "data": data}, fh)
+            os.replace(tmp, self._file(key))
+        except Exception:
+            pass
+
+_default = None
+
+def default_cache():
+    global _default
+    if _default is None:
+        _default = DiskCache()
+    return _default
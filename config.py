@@ -14,11 +14,14 @@ TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "REEMPLAZA_CON_TU_CHAT_ID")  #
 # --- Opciones generales ---
 TIMEZONE = os.getenv("SERPICKS_TZ", "America/Mexico_City")
 
-# Ligas importantes (API-Football IDs/Names se manejan por nombre; el fetch filtra por league names)
-IMPORTANT_LEAGUES = {
-    "Premier League", "La Liga", "Bundesliga", "Serie A", "Ligue 1",
-    "Liga MX", "Eredivisie", "UEFA Champions League", "Leagues Cup"
+# Ligas importantes: nombre -> id de API-Football. Se consultan server-side por
+# id + temporada actual (una petición por liga, en paralelo), no filtrando la lista global
+LEAGUE_IDS = {
+    "Premier League": 39, "La Liga": 140, "Bundesliga": 78, "Serie A": 135, "Ligue 1": 61,
+    "Liga MX": 262, "Eredivisie": 88, "UEFA Champions League": 2, "Leagues Cup": 772,
 }
+IMPORTANT_LEAGUES = set(LEAGUE_IDS)
+SEASON_TTL = int(os.getenv("SERPICKS_TTL_SEASON", "86400"))   # temporada actual por liga: 1 día
 
 # Límites y umbrales
 MAX_PICKS_PER_DAY = 10
@@ -27,9 +30,116 @@ MIN_EDGE_FOR_STRONG = 0.05     # >=5% edge -> “Fuerte”
 MIN_EDGE_FOR_SOFT = 0.01       # 1–5% edge -> “Moderado”
 FALLBACK_IF_NO_VALUE = True    # si no hay valor alto, igual mandar picks con advertencia
 
+# Parlays: una pata por partido, búsqueda branch-and-bound por EV sobre los mejores candidatos
+PARLAY_POOL = int(os.getenv("SERPICKS_PARLAY_POOL", "200"))           # candidatos (por edge) que entran a la búsqueda
+PARLAY_MIN_LEGS = int(os.getenv("SERPICKS_PARLAY_MIN_LEGS", "2"))
+PARLAY_MAX_LEGS = int(os.getenv("SERPICKS_PARLAY_MAX_LEGS", "3"))
+PARLAY_MIN_PROB = float(os.getenv("SERPICKS_PARLAY_MIN_PROB", "0.10"))  # prob. conjunta mínima (evita parlays lotería)
+PARLAY_TOP_N = int(os.getenv("SERPICKS_PARLAY_TOP_N", "1"))           # parlays en el mensaje
+
 # Over/Under por defecto (si no hay mercado xG) -> líneas estándar
 DEFAULT_GOALS_LINES = [2.5, 3.0]
 
 # MLB Config
 MLB_MAX_PICKS_PER_GAME = 2
-MLB_DEFAULT_TOTALS = [7.5, 8.5, 9.0]
\ No newline at end of file
+MLB_DEFAULT_TOTALS = [7.5, 8.5, 9.0]
+MLB_LEAGUE_ID = int(os.getenv("SERPICKS_MLB_LEAGUE", "1"))   # id de MLB en API-Baseball (temporada = año)
+
+# Deportes registrados "clave:módulo"; cada módulo expone PROVIDER (ver sports.py)
+SPORT_MODULES = os.getenv("SERPICKS_SPORTS", "football:core,mlb:mlb_analysis")
+
+# HTTP / concurrencia
+HTTP_MAX_WORKERS = int(os.getenv("SERPICKS_HTTP_WORKERS", "8"))      # hilos para prefetch de momios
+RAPIDAPI_MAX_RPS = float(os.getenv("SERPICKS_RAPIDAPI_RPS", "5"))     # peticiones/seg por host RapidAPI
+HTTP_RATE_LIMITS = {
+    "api-football-v1.p.rapidapi.com": RAPIDAPI_MAX_RPS,
+    "api-baseball.p.rapidapi.com": RAPIDAPI_MAX_RPS,
+}
+
+# Caché en disco de respuestas RapidAPI (compartida entre modos del cron)
+CACHE_DIR = os.getenv("SERPICKS_CACHE_DIR", ".serpicks_cache")
+CACHE_TTL_FIXTURES = int(os.getenv("SERPICKS_TTL_FIXTURES", "7200"))   # listas de partidos: 2 h
+CACHE_TTL_ODDS = int(os.getenv("SERPICKS_TTL_ODDS", "900"))            # momios: 15 min
+CACHE_STALE_MAX = int(os.getenv("SERPICKS_STALE_MAX", "86400"))        # copia vieja usable si la API falla
+
+# Reintentos HTTP (429/5xx/errores de red) con backoff exponencial + jitter
+HTTP_RETRIES = int(os.getenv("SERPICKS_HTTP_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.getenv("SERPICKS_HTTP_BACKOFF", "0.5"))   # segundos
+HTTP_BACKOFF_MAX = float(os.getenv("SERPICKS_HTTP_BACKOFF_MAX", "20"))
+
+# Momios: True -> mejor precio entre casas; False -> primera casa encontrada
+ODDS_BEST_PRICE = os.getenv("SERPICKS_BEST_PRICE", "0") == "1"
+
+# Momios en bloque (por liga/temporada/fecha, paginado) en lugar de uno por partido
+ODDS_BULK = os.getenv("SERPICKS_ODDS_BULK", "1") == "1"
+
+# Estado entre corridas (recheck incremental)
+STATE_DIR = os.getenv("SERPICKS_STATE_DIR", ".serpicks_state")
+RECHECK_KICKOFF_WINDOW_MIN = int(os.getenv("SERPICKS_KICKOFF_WINDOW", "90"))  # siempre refrescar si empieza pronto
+STATE_ODDS_MAX_AGE = int(os.getenv("SERPICKS_STATE_ODDS_MAX_AGE", "10800"))   # reusar snapshot de momios (modo por partido)
+
+# Modelo de goles (matriz de marcadores Poisson / Poisson bivariado)
+GOALS_MAX = int(os.getenv("SERPICKS_GOALS_MAX", "10"))               # marcador máximo por equipo en la matriz
+GOALS_COVARIANCE = float(os.getenv("SERPICKS_GOALS_COV", "0.0"))     # λ3 del Poisson bivariado (0 = independiente)
+GOALS_LAMBDA_STEP = float(os.getenv("SERPICKS_LAMBDA_STEP", "0.01"))  # redondeo de (λh, λa) para la caché
+
+# Forma reciente de equipos (store local incremental)
+TEAM_FORM_MATCHES = int(os.getenv("SERPICKS_FORM_MATCHES", "5"))      # últimos N partidos por equipo
+TEAM_STATS_FETCH_XG = os.getenv("SERPICKS_FETCH_XG", "0") == "1"      # pedir /fixtures/statistics para xG real
+
+# Histórico local (SQLite) de fixtures, snapshots de momios y resultados para backtests
+HISTORY_DB = os.getenv("SERPICKS_HISTORY_DB", os.path.join(STATE_DIR, "history.sqlite"))
+HISTORY_CAPTURE = os.getenv("SERPICKS_HISTORY", "1") == "1"
+# Libro de picks publicados (mismo SQLite) y su liquidación contra marcador y momio de cierre
+SETTLE_AFTER_H = float(os.getenv("SERPICKS_SETTLE_AFTER_H", "4"))      # liquidar picks con kickoff hace más de N horas
+SETTLE_VOID_DAYS = int(os.getenv("SERPICKS_SETTLE_VOID_DAYS", "3"))     # sin marcador tras N días: se anula
+
+# Grabar/reproducir respuestas HTTP (perfilado y benchmarks sin tocar RapidAPI/Telegram)
+HTTP_MODE = os.getenv("SERPICKS_HTTP_MODE", "live")                  # live | record | replay
+RECORD_DIR = os.getenv("SERPICKS_RECORD_DIR", "recordings")
+REPLAY_LATENCY_MS = float(os.getenv("SERPICKS_REPLAY_LATENCY_MS", "0"))  # latencia inyectada por petición
+REPLAY_JITTER_MS = float(os.getenv("SERPICKS_REPLAY_JITTER_MS", "0"))
+REPLAY_ERROR_RATE = float(os.getenv("SERPICKS_REPLAY_ERROR_RATE", "0"))  # fracción de respuestas 503
+
+# Instrumentación: reporte JSON y/o texto Prometheus al final de cada corrida
+METRICS_JSON = os.getenv("SERPICKS_METRICS_JSON", "")     # ruta; "-" = stderr; vacío = no escribir
+METRICS_PROM = os.getenv("SERPICKS_METRICS_PROM", "")     # ruta del archivo de texto Prometheus
+
+# Deportes en paralelo: timeout por deporte y deadline global de gather_picks_for (segundos)
+SPORT_TIMEOUT_S = {
+    "football": float(os.getenv("SERPICKS_TIMEOUT_FOOTBALL", "240")),
+    "mlb": float(os.getenv("SERPICKS_TIMEOUT_MLB", "180")),
+}
+RUN_DEADLINE_S = float(os.getenv("SERPICKS_RUN_DEADLINE", "300"))
+DEADLINE_GRACE_S = float(os.getenv("SERPICKS_DEADLINE_GRACE", "5"))   # margen para cerrar con parciales
+
+# Streaming de picks: partidos por lote del modelo antes de emitir resultados
+STREAM_CHUNK = int(os.getenv("SERPICKS_STREAM_CHUNK", "128"))
+
+# Modo daemon (python main.py daemon): trabajos diarios "modo@HH:MM" en SCHEDULE_TZ
+SCHEDULE = os.getenv("SERPICKS_SCHEDULE", "analyze_tomorrow@01:30,settle@10:00,recheck_today@14:30,send_today@14:35")
+SCHEDULE_TZ = os.getenv("SERPICKS_SCHEDULE_TZ", "UTC")                  # mismo reloj que el cron de Railway
+SCHEDULE_MISFIRE_S = int(os.getenv("SERPICKS_SCHEDULE_MISFIRE", "600"))  # un trabajo atrasado más que esto se salta
+RECHECK_EVERY_MIN = int(os.getenv("SERPICKS_RECHECK_EVERY", "5"))       # recheck si hay kickoff próximo; 0 = apagado
+RECHECK_MIN_EDGE_MOVE = float(os.getenv("SERPICKS_RECHECK_EDGE_MOVE", "0.01"))  # cambio de edge que amerita aviso (1 pt)
+RECHECK_MIN_ODDS_MOVE = float(os.getenv("SERPICKS_RECHECK_ODDS_MOVE", "0.02"))  # cambio relativo de momio que amerita aviso
+RUN_LOCK_TIMEOUT_S = int(os.getenv("SERPICKS_RUN_LOCK_TIMEOUT", "900")) # espera máx. por otra corrida en curso
+CACHE_MEM_MAX = int(os.getenv("SERPICKS_CACHE_MEM_MAX", "4096"))        # respuestas en memoria (proceso residente)
+
+# Watcher de momios (python main.py watch): intervalo de sondeo según minutos al kickoff,
+# "umbral:intervalo" en minutos; se usa el primer umbral que el partido supera
+WATCH_TIERS = os.getenv("SERPICKS_WATCH_TIERS", "360:60,120:20,30:5,0:2")
+WATCH_BUDGET_PER_DAY = int(os.getenv("SERPICKS_WATCH_BUDGET", "1000"))    # peticiones/día para el watcher
+WATCH_QUOTA_RESERVE = int(os.getenv("SERPICKS_WATCH_RESERVE", "500"))    # pausa si la cuota RapidAPI baja de esto
+WATCH_COALESCE_S = int(os.getenv("SERPICKS_WATCH_COALESCE", "60"))       # adelanta sondeos cercanos al mismo lote
+WATCH_IN_DAEMON = os.getenv("SERPICKS_WATCH_IN_DAEMON", "0") == "1"
+
+# Entrega por Telegram: varios destinos (coma), troceo y límites de la Bot API
+TELEGRAM_CHAT_IDS = [c.strip() for c in os.getenv("TELEGRAM_CHAT_IDS", TELEGRAM_CHAT_ID).split(",") if c.strip()]
+TELEGRAM_MAX_CHARS = int(os.getenv("SERPICKS_TG_MAX_CHARS", "4096"))
+TELEGRAM_GLOBAL_RPS = float(os.getenv("SERPICKS_TG_GLOBAL_RPS", "25"))     # Telegram: ~30 msg/s por bot
+TELEGRAM_CHAT_RPS = float(os.getenv("SERPICKS_TG_CHAT_RPS", "1"))          # ~1 msg/s por chat privado
+TELEGRAM_GROUP_PER_MIN = float(os.getenv("SERPICKS_TG_GROUP_PER_MIN", "20"))  # ~20 msg/min por grupo/canal
+TELEGRAM_RETRIES = int(os.getenv("SERPICKS_TG_RETRIES", "5"))
+TELEGRAM_WORKERS = int(os.getenv("SERPICKS_TG_WORKERS", "8"))
+TELEGRAM_DEDUPE_S = int(os.getenv("SERPICKS_TG_DEDUPE", "86400"))          # mismo texto al mismo chat: no se reenvía
@@ -1,11 +1,14 @@
 # =======================
 # SERPICKS – FOOTBALL CORE
 # =======================
-import requests
-from datetime import datetime, timedelta, timezone
-import zoneinfo
-from config import API_FOOTBALL_KEY, IMPORTANT_LEAGUES, TIMEZONE, MAX_PICKS_PER_MATCH, DEFAULT_GOALS_LINES, MIN_EDGE_FOR_STRONG, MIN_EDGE_FOR_SOFT, FALLBACK_IF_NO_VALUE
-from utils import implied_prob_from_decimal, decimal_to_american, edge, label_edge, clamp
+import http_client, state, team_stats
+import sys
+from config import API_FOOTBALL_KEY, LEAGUE_IDS, SEASON_TTL, CACHE_TTL_FIXTURES, CACHE_TTL_ODDS, ODDS_BULK, DEFAULT_GOALS_LINES, MIN_EDGE_FOR_STRONG, MIN_EDGE_FOR_SOFT
+from odds import OddsIndex
+from picks import Pick
+import pricing
+from sports import Provider
+from utils import clamp, as_date, utc_window_for_local_day, parse_api_dt, local_tz
 
 HEADERS_FOOTBALL = {
     "x-rapidapi-key": API_FOOTBALL_KEY,
@@ -13,52 +16,81 @@ HEADERS_FOOTBALL = {
 }
 
 def _tz():
-    return zoneinfo.ZoneInfo(TIMEZONE)
+    return local_tz()
 
-def _localize(dt_str):
-    # API-Football returns ISO times in UTC; convert to local TZ
-    dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-    return dt.astimezone(_tz())
+FINISHED = {"FT", "AET", "PEN"}
 
-def get_todays_fixtures():
-    # fixtures by date (today) — filter by IMPORTANT_LEAGUES automatically
-    today = datetime.now(timezone.utc).date()
+def _current_season(league_id):
+    """Temporada actual de la liga según la API (cacheada SEASON_TTL)."""
+    url = "https://api-football-v1.p.rapidapi.com/v3/leagues"
+    data = http_client.get_json(url, headers=HEADERS_FOOTBALL, params={"id": league_id, "current": "true"},
+                                ttl=SEASON_TTL)
+    for lg in data.get("response", []):
+        for season in lg.get("seasons", []):
+            if season.get("current"):
+                return season.get("year")
+    return None
+
+def _league_fixtures(key):
+    league_id, since, until = key
+    season = _current_season(league_id)
+    if season is None:
+        return []
     url = "https://api-football-v1.p.rapidapi.com/v3/fixtures"
-    params = {"date": today.isoformat()}
-    r = requests.get(url, headers=HEADERS_FOOTBALL, params=params, timeout=30)
-    r.raise_for_status()
-    data = r.json().get("response", [])
-    # Keep only important leagues
-    fixtures = [f for f in data if f.get("league", {}).get("name") in IMPORTANT_LEAGUES]
+    params = {"league": league_id, "season": season, "from": since, "to": until}
+    return http_client.get_json(url, headers=HEADERS_FOOTBALL, params=params, ttl=CACHE_TTL_FIXTURES).get("response", [])
+
+def get_fixtures_for(day=None, strict=False):
+    """
+    Fixtures de LEAGUE_IDS cuyo kickoff cae en `day` (fecha local TIMEZONE).
+    Una consulta por liga (id + temporada + las 1–2 fechas UTC del día),
+    repartidas en el pool; solo viajan los partidos de esas ligas. Una liga
+    que falla se avisa y se omite (strict=True: RuntimeError, el slate no
+    está completo).
+    """
+    day = as_date(day, _tz())
+    start, end, utc_days = utc_window_for_local_day(day, _tz())
+    since, until = utc_days[0].isoformat(), utc_days[-1].isoformat()
+    keys = [(lid, since, until) for lid in LEAGUE_IDS.values()]
+    shards = http_client.fetch_many(_league_fixtures, keys)
+    fixtures, seen = [], set()
+    for key in keys:
+        data = shards.get(key)
+        if data is None:
+            if strict:
+                raise RuntimeError(f"fixtures: liga {key[0]} sin datos")
+            print(f"WARN fixtures: liga {key[0]} sin datos", file=sys.stderr)
+            continue
+        for f in data:
+            fid = f["fixture"]["id"]
+            if fid in seen or not (start <= parse_api_dt(f["fixture"]["date"]) < end):
+                continue
+            seen.add(fid)
+            fixtures.append(f)
     return fixtures
 
+def get_todays_fixtures():
+    return get_fixtures_for(None)
+
 def _extract_decimal_odds(odds_data, market_key, outcome_key):
     """
-    odds_data: markets from API-Football odds endpoint
+    odds_data: OddsIndex o markets crudos del endpoint de odds de API-Football
     market_key: e.g., "Match Winner", "Double Chance", "Goals Over/Under"
     outcome_key: e.g., "Home", "Draw", "Away" or "1X", "12", "X2", "Over 2.5"
     """
     if not odds_data:
         return None
-    for b in odds_data:
-        for m in b.get("bookmakers", []):
-            for mk in m.get("bets", []):
-                if mk.get("name") == market_key:
-                    for v in mk.get("values", []):
-                        if v.get("value") == outcome_key and v.get("odd"):
-                            try:
-                                return float(v["odd"])
-                            except Exception:
-                                pass
-    return None
+    if not isinstance(odds_data, OddsIndex):
+        odds_data = OddsIndex(odds_data)
+    return odds_data.price(market_key, outcome_key)
 
-def get_odds_for_fixture(fixture_id):
+def get_odds_for_fixture(fixture_id, ttl=CACHE_TTL_ODDS):
     url = "https://api-football-v1.p.rapidapi.com/v3/odds"
     params = {"fixture": fixture_id, "bookmaker": 8}  # 8=Pinny si está disponible; puedes cambiar bookmaker
-    r = requests.get(url, headers=HEADERS_FOOTBALL, params=params, timeout=30)
-    if r.status_code != 200:
+    try:
+        return http_client.get_json(url, headers=HEADERS_FOOTBALL, params=params, ttl=ttl).get("response", [])
+    except Exception:
         return None
-    return r.json().get("response", [])
 
 def estimate_goals_xg(stats_home, stats_away):
     """
@@ -77,122 +109,165 @@ def estimate_goals_xg(stats_home, stats_away):
     total = clamp(exp_home + exp_away, 0.5, 5.0)
     return exp_home, exp_away, total
 
-def get_recent_stats(team_id):
-    # Placeholder simple: podrías enriquecer con endpoints /fixtures?team= & last=5
-    # Aquí devolvemos stats estimados rápidos (evita múltiples llamadas para simplicidad).
-    return {"xg_recent": 1.2, "gf5": 6, "ga5": 5}
-
-def analyze_fixture(fix):
-    fid = fix["fixture"]["id"]
-    home = fix["teams"]["home"]["name"]
-    away = fix["teams"]["away"]["name"]
-    league = fix["league"]["name"]
-    dt_local = _localize(fix["fixture"]["date"])
-    stats_home = get_recent_stats(fix["teams"]["home"]["id"])
-    stats_away = get_recent_stats(fix["teams"]["away"]["id"])
-    exp_h, exp_a, exp_total = estimate_goals_xg(stats_home, stats_away)
-
-    # Cargar momios
-    odds_data = get_odds_for_fixture(fid)
-    dec_home = _extract_decimal_odds(odds_data, "Match Winner", "Home")
-    dec_draw = _extract_decimal_odds(odds_data, "Match Winner", "Draw")
-    dec_away = _extract_decimal_odds(odds_data, "Match Winner", "Away")
-
-    # Probabilidades “modelo” muy sencillas (mejorarlas es fácil: ELO/xG)
-    # Favorece al equipo con mayor exp_goals
-    total_x = exp_h + exp_a
-    p_home = clamp(exp_h / total_x + 0.05, 0.05, 0.85)
-    p_away = clamp(exp_a / total_x - 0.05, 0.05, 0.85)
-    p_draw = clamp(1 - (p_home + p_away), 0.05, 0.5)
-
-    picks = []
-
-    # 1) Ganador (1X2) – elegir mejor edge
-    cand = []
-    for label, p, dec in [("Local", p_home, dec_home), ("Empate", p_draw, dec_draw), ("Visitante", p_away, dec_away)]:
-        if dec:
-            e = edge(p, dec)
-            cand.append((label, p, dec, e))
-    cand.sort(key=lambda x: (x[3] if x[3] is not None else -9), reverse=True)
-    if cand:
-        label, p, dec, e = cand[0]
-        picks.append({
-            "type": f"1X2 – {label}",
-            "league": league,
-            "home": home, "away": away,
-            "dt_local": dt_local, "exp_goals": exp_total,
-            "odds_dec": dec, "odds_amer": decimal_to_american(dec),
-            "edge": e, "edge_label": label_edge(e),
-            "note": "Valor fuerte" if (e or 0) >= MIN_EDGE_FOR_STRONG else ("Valor moderado" if (e or 0) >= MIN_EDGE_FOR_SOFT else "Valor bajo")
-        })
-
-    # 2) Doble oportunidad – asegura opciones si 1X2 no tiene valor
-    dc_candidates = [
-        ("1X", max(p_home + p_draw - 0.02, 0.0), _extract_decimal_odds(odds_data, "Double Chance", "1X")),
-        ("12", max(p_home + p_away - 0.01, 0.0), _extract_decimal_odds(odds_data, "Double Chance", "12")),
-        ("X2", max(p_draw + p_away - 0.02, 0.0), _extract_decimal_odds(odds_data, "Double Chance", "X2")),
-    ]
-    dc_candidates = [(k,p,dec, edge(p,dec) if dec else None) for (k,p,dec) in dc_candidates]
-    dc_candidates = [c for c in dc_candidates if c[2]]
-    dc_candidates.sort(key=lambda x: (x[3] if x[3] is not None else -9), reverse=True)
-    if dc_candidates:
-        k,p,dec,e = dc_candidates[0]
-        picks.append({
-            "type": f"Doble Oportunidad – {k}",
-            "league": league, "home": home, "away": away,
-            "dt_local": dt_local, "exp_goals": exp_total,
-            "odds_dec": dec, "odds_amer": decimal_to_american(dec),
-            "edge": e, "edge_label": label_edge(e),
-            "note": "Seguro/consistente; útil para banca."
-        })
-
-    # 3) Over/Under goles según exp_total
-    best_ou = None
-    for line in DEFAULT_GOALS_LINES:
-        # prob over por Poisson simplificada (proxy): cuanto más excede total la línea, mayor prob
-        diff = exp_total - line
-        p_over = clamp(0.50 + diff*0.18, 0.05, 0.90)  # pendiente sencilla
-        p_under = 1 - p_over
-        dec_over = _extract_decimal_odds(odds_data, "Goals Over/Under", f"Over {line}")
-        dec_under = _extract_decimal_odds(odds_data, "Goals Over/Under", f"Under {line}")
-        cands = []
-        if dec_over: cands.append(("Over", line, p_over, dec_over, edge(p_over, dec_over)))
-        if dec_under: cands.append(("Under", line, p_under, dec_under, edge(p_under, dec_under)))
-        if cands:
-            cands.sort(key=lambda x: (x[4] if x[4] is not None else -9), reverse=True)
-            cand = cands[0]
-            if best_ou is None or (cand[4] or -9) > (best_ou[4] or -9):
-                best_ou = cand
-
-    if best_ou:
-        side, line, p, dec, e = best_ou
-        picks.append({
-            "type": f"{side} {line} goles",
-            "league": league, "home": home, "away": away,
-            "dt_local": dt_local, "exp_goals": exp_total,
-            "odds_dec": dec, "odds_amer": decimal_to_american(dec),
-            "edge": e, "edge_label": label_edge(e),
-            "note": "Basado en goles esperados (xG/formas)."
-        })
-
-    # Limitar picks por partido
-    return picks[:MAX_PICKS_PER_MATCH]
+def get_recent_stats(team_id, before=None):
+    # Forma real desde el store local (team_stats.sync la mantiene al día);
+    # si el equipo no tiene historial, valores neutros.
+    return team_stats.recent_stats(team_id, before) or {"xg_recent": 1.2, "gf5": 6, "ga5": 5}
 
-def analyze_today_football():
-    fixtures = get_todays_fixtures()
-    all_picks = []
+def prefetch_odds(fixtures, ttl=CACHE_TTL_ODDS):
+    """Descarga en paralelo los momios de todos los fixtures -> {fixture_id: odds}."""
+    return http_client.fetch_many(lambda fid: get_odds_for_fixture(fid, ttl), [f["fixture"]["id"] for f in fixtures])
+
+def _bulk_odds_group(key, ttl=CACHE_TTL_ODDS):
+    league, season, day = key
+    url = "https://api-football-v1.p.rapidapi.com/v3/odds"
+    params = {"league": league, "season": season, "date": day, "bookmaker": 8}
+    return list(http_client.iter_pages(url, headers=HEADERS_FOOTBALL, params=params, ttl=ttl))
+
+def get_odds_bulk(fixtures, ttl=CACHE_TTL_ODDS):
+    """
+    Momios del slate completo en pocas llamadas paginadas: una consulta
+    /v3/odds por (liga, temporada, fecha) en vez de una por fixture.
+    Devuelve {fixture_id: odds}; los grupos que fallan se piden fixture a fixture.
+    """
+    groups = {}
     for f in fixtures:
-        all_picks.extend(analyze_fixture(f))
-    # Ordenar por edge descendente
-    all_picks.sort(key=lambda x: (x["edge"] if x["edge"] is not None else -9), reverse=True)
-    # Si nadie tiene buen valor y el flag permite, mantenemos “mejores disponibles”
-    if not all_picks and FALLBACK_IF_NO_VALUE:
+        lg = f.get("league", {})
+        key = (lg.get("id"), lg.get("season"), f["fixture"]["date"][:10])
+        groups.setdefault(key, []).append(f)
+    keys = [k for k in groups if k[0] is not None and k[1] is not None]
+    pages = http_client.fetch_many(lambda k: _bulk_odds_group(k, ttl), keys)
+
+    wanted = {f["fixture"]["id"] for f in fixtures}
+    out, missing = {}, []
+    for key, fs in groups.items():
+        items = pages.get(key)
+        if items is None:
+            missing.extend(fs)
+            continue
+        for item in items:
+            fid = item.get("fixture", {}).get("id")
+            if fid in wanted:
+                out.setdefault(fid, []).append(item)
+    if missing and not http_client.expired():
+        out.update(prefetch_odds(missing, ttl))
+    return out
+
+def _pick_note(group, e):
+    if group == pricing.GROUP_1X2:
+        return "Valor fuerte" if (e or 0) >= MIN_EDGE_FOR_STRONG else ("Valor moderado" if (e or 0) >= MIN_EDGE_FOR_SOFT else "Valor bajo")
+    if group == pricing.GROUP_DC:
+        return "Seguro/consistente; útil para banca."
+    if group == pricing.GROUP_BTTS:
+        return "Matriz de marcadores (Poisson) con goles esperados."
+    return "Basado en goles esperados (xG/formas)."
+
+def _pick_type(col):
+    group, label, _, _, line = col
+    if group == pricing.GROUP_1X2:
+        return f"1X2 – {label}"
+    if group == pricing.GROUP_DC:
+        return f"Doble Oportunidad – {label}"
+    if group == pricing.GROUP_BTTS:
+        return f"Ambos anotan – {label}"
+    return f"{label} {line} goles"
+
+def analyze_fixtures(pairs, point_in_time=False):
+    """
+    Versión batch de analyze_fixture: pairs = [(fixture, odds)].
+    Probabilidades, edges, etiquetas y top-k por partido se calculan para
+    todo el slate en una pasada vectorizada (pricing.price_slate).
+    point_in_time=True (backtests): la forma usa solo partidos previos al kickoff.
+    """
+    if not pairs:
         return []
-    return all_picks
-    # --- Backwards-compat alias to avoid Railway crash ---
-def analyze_football_for(day: str | None = None):
+    exp_h, exp_a, indexes = [], [], []
+    for fix, odds_data in pairs:
+        before = fix["fixture"]["date"] if point_in_time else None
+        stats_home = get_recent_stats(fix["teams"]["home"]["id"], before)
+        stats_away = get_recent_stats(fix["teams"]["away"]["id"], before)
+        h, a, _ = estimate_goals_xg(stats_home, stats_away)
+        exp_h.append(h)
+        exp_a.append(a)
+        indexes.append(OddsIndex(odds_data))
+
+    cols = pricing.columns(DEFAULT_GOALS_LINES)
+    types = [_pick_type(c) for c in cols]
+    odds = pricing.odds_matrix(indexes, DEFAULT_GOALS_LINES)
+    res = pricing.price_slate(exp_h, exp_a, odds)
+    out = []
+    for i, (fix, _) in enumerate(pairs):
+        fid, league = fix["fixture"]["id"], fix["league"]["name"]
+        home, away = fix["teams"]["home"]["name"], fix["teams"]["away"]["name"]
+        kickoff = parse_api_dt(fix["fixture"]["date"])
+        exp_goals = float(res["exp_total"][i])
+        picks = []
+        for g in range(pricing.N_GROUPS):
+            if not res["keep"][i, g]:
+                continue
+            j = res["best_col"][i, g]
+            e = float(res["best_edge"][i, g])
+            picks.append(Pick(fid, home, away, kickoff, types[j], cols[j][2], cols[j][3],
+                              float(odds[i, j]), e, note=_pick_note(g, e),
+                              league=league, exp_goals=exp_goals,
+                              prob=float(res["prob"][i, j]), push=float(res["push"][i, j])))
+        out.append(picks)
+    return out
+
+def analyze_fixture(fix, odds_data=None):
+    # Cargar momios (si no vienen del prefetch)
+    if odds_data is None:
+        odds_data = get_odds_for_fixture(fix["fixture"]["id"])
+    return analyze_fixtures([(fix, odds_data)])[0]
+
+def _slate_odds(fixtures, prev, now, ttl=CACHE_TTL_ODDS):
+    """
+    Momios del slate. En bloque son pocas páginas y el campo 'update' decide
+    qué recalcular; fixture a fixture solo se piden los que no tienen
+    snapshot reciente o empiezan pronto. ttl: antigüedad máxima en caché.
+    """
+    if ODDS_BULK:
+        return get_odds_bulk(fixtures, ttl)
+    odds_map, pending = {}, []
+    for f in fixtures:
+        snap = state.reusable_odds(prev, f["fixture"]["id"], parse_api_dt(f["fixture"]["date"]), now)
+        if snap is None:
+            pending.append(f)
+        else:
+            odds_map[f["fixture"]["id"]] = snap
+    odds_map.update(prefetch_odds(pending, ttl))
+    return odds_map
+
+def final_score(fix):
     """
-    Compatibilidad con versiones anteriores.
-    Ignora el parámetro y analiza los partidos de HOY.
+    (goles local, goles visita) a los 90 minutos si el partido terminó; si no,
+    None. Los mercados se liquidan al tiempo reglamentario.
     """
-    return analyze_today_football()
\ No newline at end of file
+    if fix.get("fixture", {}).get("status", {}).get("short") not in FINISHED:
+        return None
+    return team_stats.regular_time_score(fix)
+
+PROVIDER = Provider(
+    key="football", name="Fútbol",
+    fetch=get_fixtures_for,
+    item_id=lambda f: f["fixture"]["id"],
+    kickoff=lambda f: parse_api_dt(f["fixture"]["date"]),
+    prepare=team_stats.sync,
+    odds=_slate_odds,
+    model=analyze_fixtures,
+    odds_one=get_odds_for_fixture,
+    result=final_score,
+    quota_url="https://api-football-v1.p.rapidapi.com/v3/odds",
+)
+
+def analyze_football_for(day=None, deadline=None, limit=None):
+    """
+    Analiza los partidos del día local `day` (date o 'YYYY-MM-DD'; None = hoy).
+    Incremental: reusa los picks de la corrida anterior si los momios no se movieron.
+    deadline (time.monotonic): las descargas que no lleguen a tiempo se omiten
+    y se devuelven los picks parciales. limit: solo los mejores `limit` picks.
+    """
+    return PROVIDER.analyze(day, deadline, limit)
+
+def analyze_today_football():
+    return analyze_football_for(None)
@@ -0,0 +1,184 @@
+# =======================
+# SERPICKS – TELEGRAM DELIVERY
+# =======================
+import hashlib, json, os, sys, tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+from http_client import RateLimiter
+from config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_IDS, TELEGRAM_MAX_CHARS, TELEGRAM_GLOBAL_RPS,
+    TELEGRAM_CHAT_RPS, TELEGRAM_GROUP_PER_MIN, TELEGRAM_RETRIES, TELEGRAM_WORKERS,
+    TELEGRAM_DEDUPE_S, STATE_DIR
+)
+
+# ----------------- Troceo -----------------
+def _tg_len(s):
+    """Telegram cuenta el límite en unidades UTF-16 (un emoji puede valer 2)."""
+    return len(s.encode("utf-16-le")) // 2
+
+def _hard_split(line, limit):
+    out = []
+    while _tg_len(line) > limit:
+        n = min(len(line), limit)
+        while _tg_len(line[:n]) > limit:
+            n -= 1
+        out.append(line[:n])
+        line = line[n:]
+    return out + [line]
+
+def _fit(block, limit):
+    """Un bloque que no cabe se parte entre líneas (y una línea enorme, a la fuerza)."""
+    if _tg_len(block) <= limit:
+        return [block]
+    out, cur = [], ""
+    for line in block.split("\n"):
+        for piece in _hard_split(line, limit):
+            cand = piece if not cur else cur + "\n" + piece
+            if _tg_len(cand) <= limit:
+                cur = cand
+            else:
+                out.append(cur)
+                cur = piece
+    return out + ([cur] if cur else [])
+
+def split_message(text, limit=TELEGRAM_MAX_CHARS):
+    """
+    Trozos de <= limit, cortando entre picks (bloques separados por línea en
+    blanco) para que ningún pick quede partido entre dos mensajes.
+    """
+    if _tg_len(text) <= limit:
+        return [text]
+    chunks, cur = [], ""
+    for block in text.split("\n\n"):
+        for piece in _fit(block, limit):
+            cand = piece if not cur else cur + "\n\n" + piece
+            if _tg_len(cand) <= limit:
+                cur = cand
+            else:
+                if cur:
+                    chunks.append(cur)
+                cur = piece
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+# ----------------- Dedupe entre corridas -----------------
+class _SentLog:
+    """
+    Qué se entregó a cada chat: {sha1(chat + texto): {"ts", "chunks"}}.
+    Un mensaje completo no se reenvía dentro de TELEGRAM_DEDUPE_S; uno que
+    quedó a medias se retoma desde el primer trozo pendiente.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._data is None:
+            try:
+                with open(self.path, encoding="utf-8") as fh:
+                    self._data = json.load(fh)
+            except Exception:
+                self._data = {}
+        return self._data
+
+    @staticmethod
+    def key(chat, text):
+        return hashlib.sha1(f"{chat}\0{text}".encode()).hexdigest()
+
+    def sent_chunks(self, key):
+        with self._lock:
+            entry = self._load().get(key)
+        if not entry or time.time() - entry["ts"] > TELEGRAM_DEDUPE_S:
+            return 0
+        return entry["chunks"]
+
+    def mark(self, key, chunks):
+        with self._lock:
+            data = self._load()
+            now = time.time()
+            for k in [k for k, v in data.items() if now - v["ts"] > TELEGRAM_DEDUPE_S]:
+                del data[k]
+            data[key] = {"ts": now, "chunks": chunks}
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    json.dump(data, fh)
+                os.replace(tmp, self.path)
+            except Exception:
+                pass
+
+_sent = _SentLog(os.path.join(STATE_DIR, "telegram_sent.json"))
+
+# ----------------- Envío -----------------
+_global_limiter = RateLimiter(TELEGRAM_GLOBAL_RPS)
+_chat_limiters = {}
+_chat_lock = threading.Lock()
+
+def _chat_limiter(chat):
+    """Grupos y canales (id negativo o @canal) tienen un límite por minuto más estricto."""
+    with _chat_lock:
+        lim = _chat_limiters.get(chat)
+        if lim is None:
+            group = str(chat).startswith(("-", "@"))
+            lim = _chat_limiters[chat] = RateLimiter(TELEGRAM_GROUP_PER_MIN / 60.0 if group else TELEGRAM_CHAT_RPS)
+        return lim
+
+def _retry_after(resp):
+    try:
+        return float(resp.json()["parameters"]["retry_after"])
+    except Exception:
+        return http_client._retry_after(resp)
+
+def send_chunk(chat, text, token=TELEGRAM_BOT_TOKEN):
+    """Un sendMessage con límites global/por chat; reintenta 429 (retry_after), 5xx y red."""
+    url = f"https://api.telegram.org/bot{token}/sendMessage"
+    for attempt in range(TELEGRAM_RETRIES + 1):
+        _global_limiter.wait()
+        _chat_limiter(chat).wait()
+        try:
+            r = http_client.request("POST", url, retries=0, json={"chat_id": chat, "text": text}, timeout=30)
+        except Exception as e:
+            print(f"WARN telegram {chat}: {e} (intento {attempt + 1})", file=sys.stderr)
+            time.sleep(http_client._backoff(attempt))
+            continue
+        if r.status_code < 400:
+            return True
+        if r.status_code != 429 and r.status_code < 500:
+            print(f"WARN telegram {chat}: HTTP {r.status_code} {r.text[:200]}", file=sys.stderr)
+            return False
+        wait = _retry_after(r) if r.status_code == 429 else None
+        time.sleep(wait if wait is not None else http_client._backoff(attempt))
+    print(f"WARN telegram {chat}: sin entregar tras {TELEGRAM_RETRIES + 1} intentos", file=sys.stderr)
+    return False
+
+def _deliver_to(chat, text, chunks):
+    key = _sent.key(chat, text)
+    done = _sent.sent_chunks(key)
+    if done >= len(chunks):
+        return "skipped"
+    for i in range(done, len(chunks)):
+        if not send_chunk(chat, chunks[i]):
+            if i > done:
+                _sent.mark(key, i)
+            return "failed"
+    _sent.mark(key, len(chunks))
+    return "sent"
+
+def deliver(text, chats=None):
+    """
+    Entrega `text` a todos los chats (TELEGRAM_CHAT_IDS) en paralelo; dentro
+    de cada chat los trozos van en orden. Devuelve {"sent", "skipped", "failed"}
+    contados por chat.
+    """
+    chats = list(chats or TELEGRAM_CHAT_IDS)
+    chunks = split_message(text)
+    out = {"sent": 0, "skipped": 0, "failed": 0}
+    if not chats or not chunks:
+        return out
+    with ThreadPoolExecutor(max_workers=max(1, min(TELEGRAM_WORKERS, len(chats)))) as pool:
+        for status in pool.map(lambda c: _deliver_to(c, text, chunks), chats):
+            out[status] += 1
+    return out
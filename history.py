@@ -0,0 +1,122 @@
+# =======================
+# SERPICKS – HISTORY STORE
+# =======================
+import json, os, sqlite3, threading, time, zlib
+from config import HISTORY_DB
+from utils import parse_api_dt
+
+# Payloads crudos de la API comprimidos (zlib+JSON). Los snapshots de momios
+# se deduplican por el campo 'update', así que recapturar no crece la base.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fixtures (
+    sport TEXT NOT NULL, fixture_id INTEGER NOT NULL, day TEXT NOT NULL,
+    kickoff TEXT NOT NULL, payload BLOB NOT NULL,
+    home_score INTEGER, away_score INTEGER,
+    PRIMARY KEY (sport, fixture_id)
+);
+CREATE INDEX IF NOT EXISTS fixtures_by_day ON fixtures (sport, day);
+CREATE TABLE IF NOT EXISTS odds (
+    sport TEXT NOT NULL, fixture_id INTEGER NOT NULL, odds_update TEXT NOT NULL,
+    captured_at REAL NOT NULL, payload BLOB NOT NULL,
+    PRIMARY KEY (sport, fixture_id, odds_update)
+);
+"""
+
+_local = threading.local()
+
+def _pack(obj):
+    return zlib.compress(json.dumps(obj, separators=(",", ":")).encode())
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob))
+
+def connect(path=None):
+    """Conexión por hilo (sqlite3 no se comparte entre hilos)."""
+    path = path or HISTORY_DB
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    if path not in conns:
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conns[path] = conn
+    return conns[path]
+
+def capture_slate(sport, day, items, odds_map, conn=None):
+    """items: [(fid, kickoff_utc, payload)] como en state.iter_incremental."""
+    conn = conn or connect()
+    now = time.time()
+    with conn:
+        for fid, kickoff, payload in items:
+            conn.execute(
+                "INSERT INTO fixtures (sport, fixture_id, day, kickoff, payload) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (sport, fixture_id) DO UPDATE SET day = excluded.day, "
+                "kickoff = excluded.kickoff, payload = excluded.payload",
+                (sport, fid, day.isoformat(), kickoff.isoformat(), _pack(payload)))
+            odds = odds_map.get(fid)
+            if odds:
+                upd = max((x.get("update") or "" for x in odds), default="") or f"ts:{int(now)}"
+                conn.execute("INSERT OR IGNORE INTO odds VALUES (?, ?, ?, ?, ?)",
+                             (sport, fid, upd, now, _pack(odds)))
+
+def record_result(sport, fid, home_score, away_score, conn=None):
+    conn = conn or connect()
+    with conn:
+        conn.execute("UPDATE fixtures SET home_score = ?, away_score = ? WHERE sport = ? AND fixture_id = ?",
+                     (home_score, away_score, sport, fid))
+
+def days(sport, since=None, until=None, settled_only=True, conn=None):
+    conn = conn or connect()
+    q = "SELECT DISTINCT day FROM fixtures WHERE sport = ?"
+    args = [sport]
+    if since:
+        q += " AND day >= ?"
+        args.append(since)
+    if until:
+        q += " AND day <= ?"
+        args.append(until)
+    if settled_only:
+        q += " AND home_score IS NOT NULL"
+    return [r[0] for r in conn.execute(q + " ORDER BY day", args)]
+
+def load_slate(sport, day, conn=None):
+    """
+    [(payload, odds_apertura, odds_cierre, home_score, away_score)] del día.
+    Apertura = primer snapshot capturado; cierre = último antes del kickoff.
+    """
+    conn = conn or connect()
+    rows = conn.execute(
+        "SELECT fixture_id, kickoff, payload, home_score, away_score FROM fixtures "
+        "WHERE sport = ? AND day = ? ORDER BY kickoff, fixture_id", (sport, day)).fetchall()
+    out = []
+    for fid, kickoff, payload, hs, as_ in rows:
+        snaps = conn.execute(
+            "SELECT captured_at, payload FROM odds WHERE sport = ? AND fixture_id = ? ORDER BY captured_at",
+            (sport, fid)).fetchall()
+        kick_ts = parse_api_dt(kickoff).timestamp()
+        before = [s for s in snaps if s[0] <= kick_ts] or snaps
+        opening = _unpack(snaps[0][1]) if snaps else []
+        closing = _unpack(before[-1][1]) if before else []
+        out.append((_unpack(payload), opening, closing, hs, as_))
+    return out
+
+def closing_odds(sport, fids, conn=None):
+    """{fid: último snapshot de momios capturado antes del kickoff} en una sola consulta."""
+    conn = conn or connect()
+    fids = list(fids)
+    out = {}
+    for i in range(0, len(fids), 500):   # límite de parámetros de sqlite
+        chunk = fids[i:i + 500]
+        rows = conn.execute(
+            f"SELECT o.fixture_id, f.kickoff, o.captured_at, o.payload FROM odds o "
+            f"JOIN fixtures f ON f.sport = o.sport AND f.fixture_id = o.fixture_id "
+            f"WHERE o.sport = ? AND o.fixture_id IN ({','.join('?' * len(chunk))}) ORDER BY o.captured_at",
+            [sport] + chunk).fetchall()
+        for fid, kickoff, captured_at, payload in rows:
+            if captured_at <= parse_api_dt(kickoff).timestamp():
+                out[fid] = payload
+    return {fid: _unpack(blob) for fid, blob in out.items()}
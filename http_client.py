@@ -0,0 +1,237 @@
+# =======================
+# SERPICKS – HTTP
+# =======================
+import random, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import requests
+from config import (
+    HTTP_MAX_WORKERS, HTTP_RATE_LIMITS, CACHE_STALE_MAX,
+    HTTP_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX, HTTP_MODE
+)
+from cache import default_cache
+import recorder, metrics
+
+class RateLimiter:
+    """
+    Espacia las peticiones a un host para no pasar de `rate` por segundo.
+    Seguro entre hilos: cada llamada a wait() reserva su turno.
+    """
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def _limiter_for(url):
+    host = urlparse(url).netloc
+    with _limiters_lock:
+        lim = _limiters.get(host)
+        if lim is None:
+            lim = _limiters[host] = RateLimiter(HTTP_RATE_LIMITS.get(host))
+        return lim
+
+# ----------------- Sesiones y reintentos -----------------
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# perf_counter() de la primera petición del proceso (main --profile-startup)
+FIRST_REQUEST_AT = None
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def _session_for(url):
+    """Una requests.Session por host: pool de conexiones + keep-alive."""
+    host = urlparse(url).netloc
+    with _sessions_lock:
+        s = _sessions.get(host)
+        if s is None:
+            s = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(HTTP_MAX_WORKERS, 1))
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _sessions[host] = s
+        return s
+
+def _retry_after(resp):
+    try:
+        return max(0.0, float(resp.headers.get("Retry-After")))
+    except Exception:
+        return None
+
+def _backoff(attempt, resp=None):
+    wait = _retry_after(resp) if resp is not None else None
+    if wait is None:
+        # full jitter: uniforme entre 0 y base*2^intento
+        wait = random.uniform(0, HTTP_BACKOFF_BASE * (2 ** attempt))
+    return min(wait, HTTP_BACKOFF_MAX)
+
+def _send(session, method, url, kwargs):
+    """Envío real, o grabación/reproducción según SERPICKS_HTTP_MODE."""
+    if HTTP_MODE == "replay":
+        return recorder.standin().handle(method, url, kwargs.get("params"), kwargs.get("json"))
+    resp = session.request(method, url, **kwargs)
+    if HTTP_MODE == "record":
+        recorder.save(method, url, kwargs.get("params"), kwargs.get("json"), resp)
+    return resp
+
+def request(method, url, retries=None, **kwargs):
+    """
+    Petición con sesión compartida, rate limit por host y reintentos en
+    429/5xx/errores de red (honra Retry-After). Tras agotar reintentos
+    devuelve la última respuesta o propaga el último error.
+    """
+    global FIRST_REQUEST_AT
+    if FIRST_REQUEST_AT is None:
+        FIRST_REQUEST_AT = time.perf_counter()
+    retries = HTTP_RETRIES if retries is None else retries
+    kwargs.setdefault("timeout", 30)
+    session = _session_for(url)
+    start = time.monotonic()
+    resp, attempt = None, 0
+    while True:
+        _limiter_for(url).wait()
+        try:
+            resp = _send(session, method, url, kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= retries:
+                metrics.record_request(method, url, None, time.monotonic() - start, attempts=attempt + 1)
+                raise
+            print(f"WARN http: {e} (reintento {attempt + 1})", file=sys.stderr)
+            time.sleep(_backoff(attempt))
+            attempt += 1
+            continue
+        if resp.status_code in RETRY_STATUS and attempt < retries:
+            time.sleep(_backoff(attempt, resp))
+            attempt += 1
+            continue
+        break
+    elapsed = time.monotonic() - start
+    metrics.record_request(method, url, resp.status_code, elapsed, len(resp.content or b""),
+                           attempt + 1, resp.headers)
+    return resp
+
+def get(url, headers=None, params=None, timeout=30):
+    return request("GET", url, headers=headers, params=params, timeout=timeout)
+
+def post(url, json=None, timeout=30):
+    return request("POST", url, json=json, timeout=timeout)
+
+def get_json(url, headers=None, params=None, ttl=0, timeout=30):
+    """
+    GET con caché en disco (clave = endpoint + params).
+    - Si hay copia con edad <= ttl, no toca la red.
+    - Si la API falla y hay copia de hasta CACHE_STALE_MAX s, devuelve esa copia.
+    - Si falla y no hay copia, propaga el error.
+    """
+    cache = default_cache()
+    key = cache.make_key(url, params)
+    if ttl > 0:
+        hit = cache.get(key, ttl)
+        if hit and hit[1]:
+            metrics.record_cache(url, "fresh")
+            return hit[0]
+        metrics.record_cache(url, "miss")
+    try:
+        r = get(url, headers=headers, params=params, timeout=timeout)
+        r.raise_for_status()
+        data = r.json()
+    except Exception:
+        stale = cache.get_stale(key, CACHE_STALE_MAX)
+        if stale is not None:
+            metrics.record_cache(url, "stale")
+            return stale
+        raise
+    if ttl > 0:
+        cache.set(key, data)
+    return data
+
+def iter_pages(url, headers=None, params=None, ttl=0):
+    """
+    Itera (streaming) los items de un endpoint paginado de API-Sports.
+    La página 1 trae paging.total; el resto se piden en paralelo y se
+    entregan en orden conforme llegan. Un error en cualquier página se propaga.
+    """
+    params = dict(params or {})
+    first = get_json(url, headers=headers, params=params, ttl=ttl)
+    yield from first.get("response", [])
+    total = (first.get("paging") or {}).get("total") or 1
+    if total <= 1:
+        return
+
+    def _page(n):
+        return get_json(url, headers=headers, params=dict(params, page=n), ttl=ttl)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(HTTP_MAX_WORKERS, total - 1))) as pool:
+        for data in pool.map(_page, range(2, total + 1)):
+            yield from data.get("response", [])
+
+# ----------------- Deadline por hilo -----------------
+# Cada pipeline deportivo corre en su hilo con su propio deadline (monotonic);
+# fetch_many no espera más allá de él y devuelve lo que haya llegado.
+_deadline = threading.local()
+
+@contextmanager
+def deadline_scope(ts):
+    prev = getattr(_deadline, "ts", None)
+    _deadline.ts = ts
+    try:
+        yield
+    finally:
+        _deadline.ts = prev
+
+def time_left():
+    """Segundos hasta el deadline del hilo actual (None = sin deadline)."""
+    ts = getattr(_deadline, "ts", None)
+    return None if ts is None else ts - time.monotonic()
+
+def expired():
+    left = time_left()
+    return left is not None and left <= 0
+
+def fetch_many(fn, keys, max_workers=None):
+    """
+    Ejecuta fn(key) en paralelo (pool acotado) y devuelve {key: resultado}.
+    Si una llamada falla, su resultado es None; el tiempo total lo marca
+    la petición más lenta, no la suma de todas. Con deadline activo
+    (deadline_scope), lo que no termine a tiempo también queda en None.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+
+    def _safe(k):
+        try:
+            return fn(k)
+        except Exception:
+            return None
+
+    workers = max(1, min(max_workers or HTTP_MAX_WORKERS, len(keys)))
+    left = time_left()
+    if left is None:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(keys, pool.map(_safe, keys)))
+    if left <= 0:
+        print(f"WARN http: deadline vencido, se omiten {len(keys)} peticiones", file=sys.stderr)
+        return dict.fromkeys(keys)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futs = [pool.submit(_safe, k) for k in keys]
+    done, pending = wait(futs, timeout=max(0.0, left))
+    pool.shutdown(wait=False, cancel_futures=True)
+    if pending:
+        print(f"WARN http: deadline, {len(pending)} de {len(keys)} peticiones sin terminar", file=sys.stderr)
+    return {k: (f.result() if f in done else None) for k, f in zip(keys, futs)}
@@ -0,0 +1,172 @@
+# =======================
+# SERPICKS – PICK LEDGER
+# =======================
+# Libro append-only de los picks publicados (send_today), en el mismo SQLite
+# del histórico. La liquidación agrega una fila por pick (nunca reescribe el
+# libro) y acumula ROI/CLV por alcance en `aggregates`, así que el pie del
+# mensaje lee los totales con una sola consulta por llave primaria.
+import sys, time
+from datetime import date, datetime, timedelta, timezone
+import history
+from odds import OddsIndex
+from settlement import settle, profit
+from config import SETTLE_AFTER_H, SETTLE_VOID_DAYS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS picks (
+    id INTEGER PRIMARY KEY,
+    sport TEXT NOT NULL, fixture_id INTEGER NOT NULL, market TEXT NOT NULL, outcome TEXT NOT NULL,
+    day TEXT NOT NULL, kickoff TEXT NOT NULL, published_at REAL NOT NULL,
+    home TEXT, away TEXT, type TEXT, odds_dec REAL NOT NULL, edge REAL, prob REAL, edge_label TEXT,
+    UNIQUE (sport, fixture_id, market, outcome)
+);
+CREATE TABLE IF NOT EXISTS open_picks (
+    pick_id INTEGER PRIMARY KEY, kickoff TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS open_by_kickoff ON open_picks (kickoff);
+CREATE TABLE IF NOT EXISTS settlements (
+    pick_id INTEGER PRIMARY KEY, settled_at REAL NOT NULL, status TEXT NOT NULL,
+    home_score INTEGER, away_score INTEGER, closing_dec REAL, profit REAL, clv REAL
+);
+CREATE TABLE IF NOT EXISTS aggregates (
+    scope TEXT PRIMARY KEY, bets INTEGER NOT NULL, profit REAL NOT NULL,
+    clv_sum REAL NOT NULL, clv_n INTEGER NOT NULL, updated_at REAL NOT NULL
+);
+"""
+
+_ready = set()
+
+def connect(path=None):
+    conn = history.connect(path)
+    if id(conn) not in _ready:
+        conn.executescript(SCHEMA)
+        _ready.add(id(conn))
+    return conn
+
+def record(picks, day, conn=None):
+    """
+    Anota los picks publicados [(clave del deporte, Pick)]. Un pick ya
+    anotado (deporte, fixture, mercado, resultado) conserva su primer
+    momio; devuelve cuántos entraron nuevos.
+    """
+    conn = conn or connect()
+    now = time.time()
+    n = 0
+    with conn:
+        for sport, p in picks:
+            if not p.odds_dec or p.kickoff is None:
+                continue
+            kickoff = p.kickoff.astimezone(timezone.utc).isoformat()
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO picks (sport, fixture_id, market, outcome, day, kickoff, published_at, "
+                "home, away, type, odds_dec, edge, prob, edge_label) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (sport, p.fixture_id, p.market, p.outcome, day.isoformat(), kickoff, now,
+                 p.home, p.away, p.type, p.odds_dec, p.edge, p.prob, p.edge_label))
+            if cur.rowcount:
+                conn.execute("INSERT INTO open_picks VALUES (?, ?)", (cur.lastrowid, kickoff))
+                n += 1
+    return n
+
+def _due(conn, now):
+    """Picks abiertos cuyo partido ya debió terminar (solo recorre open_picks)."""
+    cutoff = (now - timedelta(hours=SETTLE_AFTER_H)).isoformat()
+    return conn.execute(
+        "SELECT p.id, p.sport, p.fixture_id, p.market, p.outcome, p.day, p.kickoff, p.odds_dec "
+        "FROM open_picks o JOIN picks p ON p.id = o.pick_id WHERE o.kickoff <= ? ORDER BY o.kickoff",
+        (cutoff,)).fetchall()
+
+def _fetch_scores(groups):
+    """
+    {(deporte, día): {fid: (local, visita)}}: un slate por grupo, todos en
+    paralelo. Un slate incompleto (liga o fecha que falló) queda en None.
+    """
+    import http_client, sports
+
+    def scores(key):
+        provider = sports.get(key[0])
+        out = {}
+        for item in provider.fetch(date.fromisoformat(key[1]), strict=True):
+            score = provider.result(item)
+            if score is not None:
+                out[provider.item_id(item)] = score
+        return out
+    return http_client.fetch_many(scores, groups)
+
+def settle_open(now=None, conn=None):
+    """
+    Liquida los picks abiertos: marcadores finales con una descarga del
+    slate por (deporte, día) y momio de cierre desde el histórico (último
+    snapshot antes del kickoff). Suma cada resultado a los agregados sin
+    releer el libro. Solo se anula un pick si su slate sí se descargó y tras
+    SETTLE_VOID_DAYS el partido no aparece o no terminó. Devuelve
+    {"settled", "void", "pending"}.
+    """
+    conn = conn or connect()
+    now = (now or datetime.now(timezone.utc)).replace(microsecond=0)
+    due = _due(conn, now)
+    out = {"settled": 0, "void": 0, "pending": 0}
+    if not due:
+        return out
+    groups = sorted({(r[1], r[5]) for r in due})
+    scores = _fetch_scores(groups)
+    closing = {}
+    for sport in {g[0] for g in groups}:
+        fids = {r[2] for r in due if r[1] == sport}
+        try:
+            closing[sport] = {fid: OddsIndex(o) for fid, o in history.closing_odds(sport, fids, conn).items()}
+        except Exception as e:
+            print(f"WARN ledger: momios de cierre de {sport}:", e, file=sys.stderr)
+            closing[sport] = {}
+
+    rows, deltas = [], {}
+    void_before = (now - timedelta(days=SETTLE_VOID_DAYS)).isoformat()
+    for pid, sport, fid, market, outcome, day, kickoff, dec in due:
+        shard = scores.get((sport, day))
+        if shard is None:   # falló la descarga: queda pendiente, nunca se anula por una caída de la API
+            out["pending"] += 1
+            continue
+        score = shard.get(fid)
+        res = settle(market, outcome, *score) if score else None
+        if res is None:
+            if kickoff <= void_before:   # slate descargado y el partido sigue sin marcador final
+                rows.append((pid, now.timestamp(), "void", None, None, None, None, None))
+                out["void"] += 1
+            else:
+                out["pending"] += 1   # sin marcador todavía: se reintenta en la próxima corrida
+            continue
+        idx = closing[sport].get(fid)
+        close = idx.price(market, outcome) if idx else None
+        clv = dec / close - 1.0 if close else None
+        gain = profit(res, dec)
+        rows.append((pid, now.timestamp(), "settled", score[0], score[1], close, gain, clv))
+        out["settled"] += 1
+        for scope in ("total", f"sport:{sport}", f"market:{sport}:{market}"):
+            a = deltas.setdefault(scope, [0, 0.0, 0.0, 0])
+            a[0] += 1
+            a[1] += gain
+            if clv is not None:
+                a[2] += clv
+                a[3] += 1
+
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO settlements VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("DELETE FROM open_picks WHERE pick_id = ?", [(r[0],) for r in rows])
+        conn.executemany(
+            "INSERT INTO aggregates VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (scope) DO UPDATE SET "
+            "bets = bets + excluded.bets, profit = profit + excluded.profit, clv_sum = clv_sum + excluded.clv_sum, "
+            "clv_n = clv_n + excluded.clv_n, updated_at = excluded.updated_at",
+            [(scope, *a, now.timestamp()) for scope, a in deltas.items()])
+    # De paso, los marcadores quedan en el histórico para el backtest
+    for (sport, _), shard in scores.items():
+        for fid, (hs, as_) in (shard or {}).items():
+            history.record_result(sport, fid, hs, as_, conn=conn)
+    return out
+
+def totals(scope="total", conn=None):
+    """{"bets", "roi", "clv"} acumulados del alcance ("total", "sport:<clave>", "market:<clave>:<mercado>")."""
+    conn = conn or connect()
+    row = conn.execute("SELECT bets, profit, clv_sum, clv_n FROM aggregates WHERE scope = ?", (scope,)).fetchone()
+    if not row or not row[0]:
+        return None
+    bets, gain, clv_sum, clv_n = row
+    return {"bets": bets, "roi": gain / bets, "clv": clv_sum / clv_n if clv_n else None}
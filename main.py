@@ -1,48 +1,40 @@
 # =======================
 # SERPICKS – MAIN (OKC)
 # =======================
-from datetime import datetime, timedelta, date
-import zoneinfo, sys, requests
+import time
+_T0 = time.perf_counter()   # --profile-startup: referencia para tiempos de import/arranque
+from datetime import datetime, timedelta, date, time as dtime, timezone
+import os, signal, sys, threading
+# Solo módulos livianos al arranque; la pila HTTP (requests), los deportes
+# (numpy, sqlite) y Telegram se importan en el modo que los usa.
+import state, metrics, ranking
+from utils import local_tz
 
 from config import (
-    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TIMEZONE,
-    MAX_PICKS_PER_DAY, FALLBACK_IF_NO_VALUE
+    TELEGRAM_BOT_TOKEN,
+    MAX_PICKS_PER_DAY, FALLBACK_IF_NO_VALUE, PARLAY_POOL,
+    SPORT_TIMEOUT_S, RUN_DEADLINE_S, DEADLINE_GRACE_S,
+    SCHEDULE, SCHEDULE_TZ, SCHEDULE_MISFIRE_S, RECHECK_EVERY_MIN, RECHECK_KICKOFF_WINDOW_MIN,
+    RECHECK_MIN_EDGE_MOVE, RECHECK_MIN_ODDS_MOVE,
+    WATCH_IN_DAEMON
 )
-
-# ---- Imports robustos (soporta nombres viejos/nuevos) ----
-try:
-    from core import analyze_football_for
-except Exception:
-    try:
-        from core import analyze_today_football as analyze_football_for
-    except Exception:
-        def analyze_football_for(*args, **kwargs):
-            return []
-
-try:
-    from mlb_analysis import analyze_mlb_for
-except Exception:
-    try:
-        from mlb_analysis import analyze_today_mlb as analyze_mlb_for
-    except Exception:
-        def analyze_mlb_for(*args, **kwargs):
-            return []
+_T_IMPORTS = time.perf_counter()
 
 # ----------------- Utilidades -----------------
 def _tz():
-    return zoneinfo.ZoneInfo(TIMEZONE)
+    return local_tz()
 
 def send_to_telegram(text: str):
     if not TELEGRAM_BOT_TOKEN or "REEMPLAZA_CON_TU_TOKEN" in TELEGRAM_BOT_TOKEN:
         print("TELEGRAM_BOT_TOKEN no configurado. Solo imprimo el mensaje.\n")
         print(text)
         return
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    r = requests.post(url, json={"chat_id": TELEGRAM_CHAT_ID, "text": text}, timeout=30)
-    try:
-        r.raise_for_status()
-    except Exception as e:
-        print("WARN telegram:", e, file=sys.stderr)
+    # Troceo por picks, todos los chats en paralelo, límites de Telegram y sin reenvíos repetidos
+    import delivery
+    with metrics.span("send"):
+        res = delivery.deliver(text)
+    if res["failed"]:
+        print(f"WARN telegram: {res['failed']} chat(s) sin entregar", file=sys.stderr)
 
 def _safe_dt_str(dt_obj):
     try:
@@ -58,7 +50,7 @@ def fmt_pick(p: dict, sport: str):
     edge_val = p.get("edge")
     edge_pct = f"{edge_val*100:.1f}%" if edge_val is not None else "N/A"
     edge_label = p.get("edge_label", "")
-    league = p.get("league", "MLB" if sport == "MLB" else "")
+    league = p.get("league", sport)
 
     base = (
         f"🏷️ {sport} | {league}\n"
@@ -68,37 +60,104 @@ def fmt_pick(p: dict, sport: str):
         f"💵 Momio: {p.get('odds_amer','')} (dec {p.get('odds_dec','')})\n"
         f"📊 Edge: {edge_pct}" + (f" ({edge_label})" if edge_label else "") + "\n"
     )
-    if sport == "Fútbol" and "exp_goals" in p:
+    if "exp_goals" in p:
         base += f"🔮 Goles esperados: {p['exp_goals']:.2f}\n"
     if p.get("note"):
         base += f"📝 Nota: {p['note']}\n"
     return base
 
 # ----------------- Orquestación -----------------
-def gather_picks_for(d: date):
-    all_picks = []
+# Un solo cálculo de picks por fecha y corrida: mensaje, resumen y cualquier
+# otro render consumen el mismo resultado.
+_picks_by_day = {}
 
-    # Fútbol
-    try:
-        fut = analyze_football_for(d) or []
-        all_picks += [("Fútbol", p) for p in fut]
-    except Exception as e:
-        print("WARN fútbol:", e, file=sys.stderr)
+def _candidates_for(d: date, refresh: bool = False, odds_ttl=None):
+    if refresh or d not in _picks_by_day:
+        _picks_by_day[d] = _compute_picks_for(d, odds_ttl)
+    return _picks_by_day[d]
+
+def gather_picks_for(d: date, refresh: bool = False, odds_ttl=None):
+    """Picks publicables del día; odds_ttl acota la antigüedad de los momios en caché."""
+    return list(_candidates_for(d, refresh, odds_ttl)[:MAX_PICKS_PER_DAY])
+
+def parlay_candidates(d: date):
+    """Los mejores PARLAY_POOL picks del día por edge (los publicados van primero)."""
+    return list(_candidates_for(d))
+
+def _run_sport(idx, provider, d, deadline, top, cancel, odds_ttl=None):
+    """Vuelca los picks del deporte en el top-K compartido conforme salen."""
+    with metrics.span(f"sport.{provider.key}"):
+        try:
+            for p in provider.iter_picks(d, deadline=deadline, cancel=cancel, odds_ttl=odds_ttl):
+                if cancel.is_set():
+                    break
+                top.push((provider.name, p), tie=(idx,) + ranking.pick_tie(p))
+        except Exception as e:
+            print(f"WARN {provider.name}:", e, file=sys.stderr)
+
+def _compute_picks_for(d: date, odds_ttl=None):
+    """
+    Corre todos los deportes registrados (sports.enabled) a la vez: cada uno
+    con su timeout (SPORT_TIMEOUT_S) y todos bajo el deadline global
+    (RUN_DEADLINE_S). Los picks entran en streaming a un único top-K por
+    edge, así que un deporte que no termina a tiempo aporta lo que alcanzó a
+    analizar. El top-K guarda max(MAX_PICKS_PER_DAY, PARLAY_POOL): los
+    primeros MAX_PICKS_PER_DAY son los publicados y el resto alimenta los parlays.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait
+    import sports
+    providers = sports.enabled()
+    if not providers:
+        return []
+    start = time.monotonic()
+    hard = start + RUN_DEADLINE_S
+    top = ranking.TopK(max(MAX_PICKS_PER_DAY, PARLAY_POOL), score=lambda x: ranking.edge_of(x[1]))
+    cancel = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=len(providers), thread_name_prefix="sport")
+    futs = [pool.submit(_run_sport, i, p, d, min(start + SPORT_TIMEOUT_S.get(p.key, RUN_DEADLINE_S), hard),
+                        top, cancel, odds_ttl)
+            for i, p in enumerate(providers)]
+    done, _ = wait(futs, timeout=max(0.0, hard + DEADLINE_GRACE_S - time.monotonic()))
+    # Un deporte rezagado deja de analizar y no guarda estado (el candado de la corrida
+    # se suelta al volver); una petición HTTP en curso sí termina en su hilo.
+    cancel.set()
+    pool.shutdown(wait=False, cancel_futures=True)
+    for p, f in zip(providers, futs):
+        if f not in done:
+            print(f"WARN {p.name}: sin terminar tras el deadline, se usan sus picks parciales", file=sys.stderr)
 
-    # MLB
+    with metrics.span("rank"):
+        return top.sorted()
+
+def build_message_for(d: date, record: bool = False):
+    """Mensaje del día; con record=True (send_today) los picks quedan en el libro para liquidarlos."""
+    import ledger, parlay
+    all_picks = gather_picks_for(d)
+    if record and all_picks:
+        import sports
+        keys = {p.name: p.key for p in sports.enabled()}
+        try:
+            ledger.record([(keys.get(sport, sport), p) for sport, p in all_picks], d)
+        except Exception as e:
+            print("WARN libro de picks:", e, file=sys.stderr)
     try:
-        mlb = analyze_mlb_for(d) or []
-        all_picks += [("MLB", p) for p in mlb]
+        track = ledger.totals()
     except Exception as e:
-        print("WARN MLB:", e, file=sys.stderr)
+        print("WARN libro de picks:", e, file=sys.stderr)
+        track = None
+    with metrics.span("parlay"):
+        parlays = parlay.build(parlay_candidates(d)) if all_picks else []
+    with metrics.span("render"):
+        return _render_message(d, all_picks, track, parlays)
 
-    # Orden por edge
-    all_picks.sort(key=lambda x: (x[1].get('edge') if x[1].get('edge') is not None else -9), reverse=True)
-    return all_picks[:MAX_PICKS_PER_DAY]
+def _fmt_track(track):
+    if not track:
+        return ""
+    clv = f"{track['clv']*100:+.1f}%" if track["clv"] is not None else "N/A"
+    return f"\n📊 Histórico: {track['bets']} picks liquidados | ROI {track['roi']*100:+.1f}% | CLV {clv}"
 
-def build_message_for(d: date):
+def _render_message(d: date, all_picks, track=None, parlays=None):
     header = f"🔥 SERPICKS – Mejores Picks ({d.strftime('%Y-%m-%d')})\n\n"
-    all_picks = gather_picks_for(d)
 
     if not all_picks:
         if FALLBACK_IF_NO_VALUE:
@@ -107,16 +166,16 @@ def build_message_for(d: date):
 
     sections = [fmt_pick(p, sport) for sport, p in all_picks]
 
-    # Parlay del día (si hay 2+ con edge positivo)
-    parlay = [p for (_, p) in all_picks if (p.get('edge') or -1) > 0][:3]
+    # Parlays del día (parlay.build: una pata por partido, mejores por EV)
     parlay_txt = ""
-    if len(parlay) >= 2:
-        parlay_txt = "\n💼 Parlay (valor):\n" + "\n".join(
+    for i, pl in enumerate(parlays or []):
+        title = "Parlay (valor)" if len(parlays) == 1 else f"Parlay #{i + 1} (valor)"
+        parlay_txt += f"\n💼 {title}:\n" + "\n".join(
             [f"- {p.get('home','')} vs {p.get('away','')} | {p.get('type','')} | {p.get('odds_amer','')}"
-             for p in parlay]
-        )
+             for _, p in pl.legs]
+        ) + f"\n   Momio {pl.odds_amer} (dec {pl.odds_dec}) | Prob {pl.prob*100:.1f}% | EV {pl.ev*100:+.1f}%"
 
-    footer = "\n—\n⚠️ Apuestas responsables. Las probabilidades cambian; verifica alineaciones y clima."
+    footer = _fmt_track(track) + "\n—\n⚠️ Apuestas responsables. Las probabilidades cambian; verifica alineaciones y clima."
     return header + "\n".join(sections) + parlay_txt + footer
 
 def short_summary(d: date, tag: str):
@@ -128,17 +187,57 @@ def short_summary(d: date, tag: str):
         edge = p.get("edge")
         edge_pct = f"{edge*100:.1f}%" if edge is not None else "N/A"
         top_line = f"\nTop: {sport} — {p.get('home','')} vs {p.get('away','')} | {p.get('type','')} | Edge {edge_pct}"
-    return f"✅ {tag} listo para {d.isoformat()}.\nTotal picks candidatos: {total}.{top_line}"
+    return f"✅ {tag} listo para {d.isoformat()}.\nTotal picks candidatos: {total}.{top_line}" + changes_summary(d)
 
-# ----------------- Entry point -----------------
-if __name__ == "__main__":
-    # Modos:
-    #   python main.py analyze_tomorrow  -> analiza mañana, NOTIFICA (no envía picks)
-    #   python main.py recheck_today     -> reanaliza hoy, NOTIFICA (no envía picks)
-    #   python main.py send_today        -> analiza hoy y ENVÍA picks
-    mode = sys.argv[1] if len(sys.argv) > 1 else "send_today"
-    tz = _tz()
-    today = datetime.now(tz).date()
+def published_changes(d: date):
+    """
+    Diff de lo publicado (top MAX_PICKS_PER_DAY de todos los deportes) entre
+    la corrida anterior y la última; candidatos fuera del top no cuentan y un
+    pick solo "cambia" si su edge o su momio se mueven de forma material
+    (RECHECK_MIN_EDGE_MOVE / RECHECK_MIN_ODDS_MOVE).
+    """
+    import sports
+    old, new = [], []
+    for provider in sports.enabled():
+        run = state.LAST_RUN.get((provider.key, d))
+        if run is None:
+            continue
+        before, after = run
+        after = [p for ps in after.values() for p in (ps or [])]
+        before = after if before is None else [p for ps in before.values() for p in (ps or [])]
+        old.append((provider.name, before))
+        new.append((provider.name, after))
+    return state.diff_picks(ranking.merge_top(old, MAX_PICKS_PER_DAY), ranking.merge_top(new, MAX_PICKS_PER_DAY),
+                            tol=RECHECK_MIN_EDGE_MOVE, odds_tol=RECHECK_MIN_ODDS_MOVE)
+
+def changes_summary(d: date, limit: int = 5):
+    """Cambios en los picks publicados vs la corrida anterior (nuevos, fuera y con edge o momio movido)."""
+    ch = published_changes(d)
+    lines = []
+    for sport, p in ch["added"][:limit]:
+        lines.append(f"➕ {sport} — {p.get('home','')} vs {p.get('away','')} | {p.get('type','')}")
+    for sport, p in ch["removed"][:limit]:
+        lines.append(f"➖ {sport} — {p.get('home','')} vs {p.get('away','')} | {p.get('type','')}")
+    for sport, old, new in ch["changed"][:limit]:
+        e0 = f"{old['edge']*100:.1f}%" if old.get("edge") is not None else "N/A"
+        e1 = f"{new['edge']*100:.1f}%" if new.get("edge") is not None else "N/A"
+        lines.append(f"🔁 {sport} — {new.get('home','')} vs {new.get('away','')} | {new.get('type','')} | Edge {e0} → {e1}")
+    if not lines:
+        return ""
+    return "\nCambios vs corrida anterior:\n" + "\n".join(lines)
+
+# ----------------- Modos -----------------
+def run_mode(mode: str):
+    """
+    Un trabajo completo (lo mismo corre desde el cron o desde el daemon):
+      analyze_tomorrow -> analiza mañana, NOTIFICA (no envía picks)
+      recheck_today    -> reanaliza hoy, NOTIFICA (no envía picks)
+      send_today       -> analiza hoy y ENVÍA picks
+      recheck_near     -> reanaliza hoy y notifica solo si hubo cambios (kickoffs próximos)
+      settle           -> liquida los picks publicados ya jugados (marcador + momio de cierre)
+    """
+    today = datetime.now(_tz()).date()
+    _picks_by_day.clear()   # cada trabajo recalcula (incremental) con momios actuales
 
     if mode == "analyze_tomorrow":
         target = today + timedelta(days=1)
@@ -152,9 +251,226 @@ if __name__ == "__main__":
         send_to_telegram(short_summary(today, "Revisión matutina"))
 
     elif mode == "send_today":
-        final_msg = build_message_for(today)
+        final_msg = build_message_for(today, record=True)
         print(final_msg)
         send_to_telegram(final_msg)
 
+    elif mode == "recheck_near":
+        for key in [k for k in state.LAST_RUN if k[1] == today]:
+            del state.LAST_RUN[key]
+        # Momios más frescos que el intervalo del recheck; con CACHE_TTL_ODDS dos de cada
+        # tres rechecks repreciarían el mismo payload
+        gather_picks_for(today, odds_ttl=RECHECK_EVERY_MIN * 30)
+        if changes_summary(today):
+            send_to_telegram(short_summary(today, "Revisión previa al partido"))
+
+    elif mode == "settle":
+        import ledger
+        with metrics.span("settle"):
+            res = ledger.settle_open()
+        print(f"[LIQUIDACIÓN] {res['settled']} liquidados, {res['void']} anulados, {res['pending']} pendientes")
+        track = ledger.totals()
+        if track:
+            print(_fmt_track(track).strip())
+
     else:
-        print("Modo desconocido:", mode)
\ No newline at end of file
+        print("Modo desconocido:", mode)
+
+def _report_metrics(mode: str):
+    rep = metrics.write_report(mode)
+    t = rep["totals"]
+    print(f"[métricas] {mode}: {rep['elapsed']:.1f}s, {t['requests']} peticiones, "
+          f"{t['errors']} errores, {t['cache_hits']} hits de caché", file=sys.stderr)
+
+# ----------------- Daemon -----------------
+# Un solo proceso residente en lugar de un arranque en frío por entrada del cron:
+# sesiones HTTP, caché en memoria, forma de equipos y estado quedan calientes
+# entre trabajos. Los trabajos corren en serie; uno que se atrasa por otro
+# corre una sola vez si sigue dentro de SCHEDULE_MISFIRE_S, si no se salta.
+def _parse_schedule(spec: str):
+    jobs = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        mode, _, hhmm = item.partition("@")
+        h, m = hhmm.split(":")
+        jobs.append((mode.strip(), dtime(int(h), int(m))))
+    return jobs
+
+def _next_at(t: dtime, now: datetime):
+    nxt = datetime.combine(now.date(), t, tzinfo=now.tzinfo)
+    return nxt if nxt > now else nxt + timedelta(days=1)
+
+def _kickoff_soon():
+    """¿Algún partido de hoy empieza dentro de RECHECK_KICKOFF_WINDOW_MIN?"""
+    now = datetime.now(timezone.utc)
+    window = RECHECK_KICKOFF_WINDOW_MIN * 60
+    return any(0 <= (k - now).total_seconds() <= window
+               for k in state.kickoffs_for(datetime.now(_tz()).date()))
+
+def _run_job(mode: str):
+    metrics.reset()
+    try:
+        with state.run_lock():
+            run_mode(mode)
+    except TimeoutError as e:
+        print(f"WARN {mode}: {e}; se salta", file=sys.stderr)
+    except Exception as e:
+        print(f"WARN {mode}: falló:", e, file=sys.stderr)
+    _report_metrics(mode)
+
+def _prune_memory():
+    today = datetime.now(_tz()).date()
+    for d in [d for d in _picks_by_day if d < today]:
+        del _picks_by_day[d]
+    for store in (state.LAST_RUN, state.KICKOFFS):
+        for key in [k for k in store if k[1] < today]:
+            del store[key]
+
+def run_watch(stop: threading.Event, once: bool = True):
+    """
+    Watcher de momios de los picks de hoy (ver watcher.py). Si hoy aún no hay
+    análisis, lo corre primero. once=False (daemon): al acabar los partidos
+    del día espera picks nuevos y sigue.
+    """
+    import watcher
+    while not stop.is_set():
+        today = datetime.now(_tz()).date()
+        if once and not state.kickoffs_for(today):
+            with state.run_lock():
+                gather_picks_for(today)
+        stats = watcher.Watcher(today, send_to_telegram).run(stop)
+        print(f"[watcher] {today.isoformat()}: {stats['polls']} sondeos, {stats['moved']} mercados movidos, "
+              f"{stats['alerts']} alertas", file=sys.stderr)
+        if once:
+            return
+        stop.wait(300)
+
+def _stop_event():
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    return stop
+
+def run_daemon():
+    stop = _stop_event()
+    if WATCH_IN_DAEMON:
+        threading.Thread(target=run_watch, args=(stop, False), name="watcher", daemon=True).start()
+    sched_tz = local_tz(SCHEDULE_TZ)
+    now = datetime.now(sched_tz)
+    jobs = [[mode, t, _next_at(t, now)] for mode, t in _parse_schedule(SCHEDULE)]
+    next_recheck = time.monotonic()
+    print("[daemon] trabajos: " + ", ".join(f"{m}@{t.strftime('%H:%M')}" for m, t, _ in jobs)
+          + f" ({SCHEDULE_TZ}); recheck cada {RECHECK_EVERY_MIN} min", file=sys.stderr)
+
+    while not stop.is_set():
+        for job in sorted(jobs, key=lambda j: j[2]):
+            mode, t, due = job
+            now = datetime.now(sched_tz)
+            if due > now or stop.is_set():
+                continue
+            if (now - due).total_seconds() > SCHEDULE_MISFIRE_S:
+                print(f"WARN daemon: {mode} de las {due:%H:%M} se saltó (atrasado)", file=sys.stderr)
+            else:
+                _run_job(mode)
+            job[2] = _next_at(t, datetime.now(sched_tz))
+
+        if RECHECK_EVERY_MIN > 0 and time.monotonic() >= next_recheck and not stop.is_set():
+            next_recheck = time.monotonic() + RECHECK_EVERY_MIN * 60
+            if _kickoff_soon():
+                _run_job("recheck_near")
+        _prune_memory()
+
+        now = datetime.now(sched_tz)
+        wait_s = min([(j[2] - now).total_seconds() for j in jobs] + [60.0])
+        if RECHECK_EVERY_MIN > 0:
+            wait_s = min(wait_s, next_recheck - time.monotonic())
+        stop.wait(max(1.0, wait_s))
+    print("[daemon] detenido", file=sys.stderr)
+
+# ----------------- Perfil de arranque -----------------
+# Para corridas cortas del cron el arranque pesa: intérprete, imports base y
+# los imports perezosos de cada modo (requests, numpy, sqlite...).
+class _ImportTimer:
+    """Envuelve __import__ y mide los módulos nuevos importados desde fuera (nivel más externo)."""
+    def __init__(self):
+        import builtins
+        self.times = {}
+        self._local = threading.local()
+        self._orig = builtins.__import__
+        builtins.__import__ = self._import
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        depth = getattr(self._local, "depth", 0)
+        if depth or level or name in sys.modules:
+            self._local.depth = depth + 1
+            try:
+                return self._orig(name, globals, locals, fromlist, level)
+            finally:
+                self._local.depth = depth
+        self._local.depth = 1
+        t0 = time.perf_counter()
+        try:
+            return self._orig(name, globals, locals, fromlist, level)
+        finally:
+            self._local.depth = 0
+            self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - t0
+
+def _process_age():
+    """Segundos desde que arrancó el proceso (Linux: /proc); None si no se puede leer."""
+    try:
+        with open("/proc/self/stat") as fh:
+            start_ticks = float(fh.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as fh:
+            uptime = float(fh.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except Exception:
+        return None
+
+def _report_startup(mode: str, imports: _ImportTimer, tz_init: float, age_at_main):
+    ms = lambda s: f"{s * 1000:.0f}ms"
+    parts = []
+    if age_at_main is not None:
+        parts.append(f"intérprete {ms(max(0.0, age_at_main))}")
+    parts.append(f"imports base {ms(_T_IMPORTS - _T0)}")
+    parts.append(f"zona horaria {tz_init * 1000:.1f}ms")
+    lazy = sorted(imports.times.items(), key=lambda kv: kv[1], reverse=True)
+    top = ", ".join(f"{n} {ms(t)}" for n, t in lazy[:4])
+    parts.append(f"imports del modo {ms(sum(t for _, t in lazy))}" + (f" ({top})" if top else ""))
+    http = sys.modules.get("http_client")
+    first = getattr(http, "FIRST_REQUEST_AT", None)
+    parts.append(f"primera petición a {ms(first - _T0)}" if first else "sin peticiones HTTP")
+    parts.append(f"total {time.perf_counter() - _T0:.2f}s")
+    print(f"[arranque] {mode}: " + " | ".join(parts), file=sys.stderr)
+
+# ----------------- Entry point -----------------
+if __name__ == "__main__":
+    # Modos: analyze_tomorrow | recheck_today | send_today | recheck_near | settle (ver run_mode)
+    #   python main.py daemon  -> proceso residente que corre los trabajos según SERPICKS_SCHEDULE
+    #   python main.py watch   -> vigila los momios de los picks de hoy hasta el último kickoff
+    #   --profile-startup      -> al final reporta en stderr el tiempo de import y de arranque
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    mode = args[0] if args else "send_today"
+    if "--profile-startup" in sys.argv[1:]:
+        age = _process_age()
+        age_at_main = age - (time.perf_counter() - _T0) if age is not None else None
+        imports = _ImportTimer()
+        t = time.perf_counter()
+        _tz()
+        tz_init = time.perf_counter() - t
+        import atexit
+        atexit.register(_report_startup, mode, imports, tz_init, age_at_main)
+    if mode == "daemon":
+        run_daemon()
+    elif mode == "watch":
+        run_watch(_stop_event())
+        _report_metrics(mode)
+    else:
+        try:
+            with state.run_lock():
+                run_mode(mode)
+        except TimeoutError as e:
+            print(f"WARN {mode}: {e}", file=sys.stderr)
+            sys.exit(1)
+        _report_metrics(mode)
@@ -0,0 +1,147 @@
+# =======================
+# SERPICKS – METRICS
+# =======================
+import json, sys, threading, time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from config import METRICS_JSON, METRICS_PROM
+
+_lock = threading.Lock()
+_started = time.time()
+_spans = {}       # nombre -> {"count", "total", "max"}
+_requests = {}    # endpoint -> {"count", "errors", "status": {code: n}, "latency_total", "latency_max", "bytes", "retries"}
+_cache = {}       # endpoint -> {"fresh", "stale", "miss"}
+_quota = {}       # host -> {"remaining", "limit"}; última lectura, sobrevive a reset()
+
+def _endpoint(url):
+    u = urlparse(url)
+    path = u.path
+    if "/bot" in path:  # Telegram: no exponer el token
+        path = "/bot<token>/" + path.rsplit("/", 1)[-1]
+    return u.netloc + path
+
+@contextmanager
+def span(name):
+    """Mide una etapa (fetch fixtures, odds, modelo, rank, render, send...)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        with _lock:
+            s = _spans.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            s["count"] += 1
+            s["total"] += dt
+            s["max"] = max(s["max"], dt)
+
+def record_request(method, url, status, elapsed, nbytes=0, attempts=1, headers=None):
+    ep = _endpoint(url)
+    with _lock:
+        r = _requests.setdefault(ep, {"count": 0, "errors": 0, "status": {}, "latency_total": 0.0,
+                                      "latency_max": 0.0, "bytes": 0, "retries": 0})
+        r["count"] += 1
+        r["retries"] += max(0, attempts - 1)
+        key = str(status) if status is not None else "network_error"
+        r["status"][key] = r["status"].get(key, 0) + 1
+        if status is None or status >= 400:
+            r["errors"] += 1
+        r["latency_total"] += elapsed
+        r["latency_max"] = max(r["latency_max"], elapsed)
+        r["bytes"] += nbytes or 0
+        if headers:
+            rem = headers.get("x-ratelimit-requests-remaining")
+            lim = headers.get("x-ratelimit-requests-limit")
+            if rem is not None:
+                q = _quota.setdefault(urlparse(url).netloc, {})
+                try:
+                    q["remaining"] = int(rem)
+                    if lim is not None:
+                        q["limit"] = int(lim)
+                except ValueError:
+                    pass
+
+def record_cache(url, result):
+    """result: 'fresh' (hit), 'stale' (copia vieja por error) o 'miss'."""
+    with _lock:
+        c = _cache.setdefault(_endpoint(url), {"fresh": 0, "stale": 0, "miss": 0})
+        c[result] += 1
+
+def quota_remaining(url):
+    """Peticiones restantes del host de `url` según el último header de RapidAPI (None = desconocido)."""
+    with _lock:
+        return _quota.get(urlparse(url).netloc, {}).get("remaining")
+
+def reset():
+    """Empieza una corrida nueva (daemon). La cuota no se borra: es del proceso, no de la corrida."""
+    global _started
+    with _lock:
+        _spans.clear()
+        _requests.clear()
+        _cache.clear()
+        _started = time.time()
+
+def report(mode=None):
+    with _lock:
+        reqs = {}
+        for ep, r in _requests.items():
+            reqs[ep] = dict(r, status=dict(r["status"]),
+                            latency_avg=r["latency_total"] / r["count"] if r["count"] else 0.0)
+        return {
+            "mode": mode, "started": _started, "elapsed": time.time() - _started,
+            "spans": {k: dict(v) for k, v in _spans.items()},
+            "requests": reqs,
+            "cache": {k: dict(v) for k, v in _cache.items()},
+            "quota": {k: dict(v) for k, v in _quota.items()},
+            "totals": {
+                "requests": sum(r["count"] for r in _requests.values()),
+                "errors": sum(r["errors"] for r in _requests.values()),
+                "bytes": sum(r["bytes"] for r in _requests.values()),
+                "cache_hits": sum(c["fresh"] + c["stale"] for c in _cache.values()),
+            },
+        }
+
+def _esc(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"')
+
+def to_prometheus(rep=None):
+    rep = rep or report()
+    out = []
+    def metric(name, kind, help_, rows):
+        out.append(f"# HELP serpicks_{name} {help_}")
+        out.append(f"# TYPE serpicks_{name} {kind}")
+        for labels, value in rows:
+            lab = ",".join(f'{k}="{_esc(v)}"' for k, v in labels.items())
+            out.append(f"serpicks_{name}{{{lab}}} {value}")
+    metric("span_seconds_total", "counter", "Tiempo acumulado por etapa",
+           [({"span": k}, round(v["total"], 6)) for k, v in rep["spans"].items()])
+    metric("span_count", "counter", "Ejecuciones por etapa",
+           [({"span": k}, v["count"]) for k, v in rep["spans"].items()])
+    metric("http_requests_total", "counter", "Peticiones HTTP por endpoint y status",
+           [({"endpoint": ep, "status": st}, n) for ep, r in rep["requests"].items() for st, n in r["status"].items()])
+    metric("http_latency_seconds_total", "counter", "Latencia acumulada por endpoint",
+           [({"endpoint": ep}, round(r["latency_total"], 6)) for ep, r in rep["requests"].items()])
+    metric("http_response_bytes_total", "counter", "Bytes recibidos por endpoint",
+           [({"endpoint": ep}, r["bytes"]) for ep, r in rep["requests"].items()])
+    metric("http_retries_total", "counter", "Reintentos por endpoint",
+           [({"endpoint": ep}, r["retries"]) for ep, r in rep["requests"].items()])
+    metric("cache_lookups_total", "counter", "Consultas a la caché de respuestas",
+           [({"endpoint": ep, "result": res}, n) for ep, c in rep["cache"].items() for res, n in c.items()])
+    metric("rapidapi_quota_remaining", "gauge", "Peticiones restantes según RapidAPI",
+           [({"host": h}, q["remaining"]) for h, q in rep["quota"].items() if "remaining" in q])
+    return "\n".join(out) + "\n"
+
+def write_report(mode=None):
+    """Escribe el reporte según SERPICKS_METRICS_JSON / SERPICKS_METRICS_PROM."""
+    rep = report(mode)
+    try:
+        if METRICS_JSON == "-":
+            print(json.dumps(rep, default=str), file=sys.stderr)
+        elif METRICS_JSON:
+            with open(METRICS_JSON, "w", encoding="utf-8") as fh:
+                json.dump(rep, fh, indent=2, default=str)
+        if METRICS_PROM:
+            with open(METRICS_PROM, "w", encoding="utf-8") as fh:
+                fh.write(to_prometheus(rep))
+    except Exception as e:
+        print("WARN métricas:", e, file=sys.stderr)
+    return rep
@@ -1,11 +1,14 @@
 # =======================
 # SERPICKS – MLB CORE
 # =======================
-import requests
-from datetime import datetime, timezone
-import zoneinfo
-from config import API_BASEBALL_KEY, TIMEZONE, MLB_MAX_PICKS_PER_GAME, MLB_DEFAULT_TOTALS, MIN_EDGE_FOR_STRONG, MIN_EDGE_FOR_SOFT
-from utils import decimal_to_american, implied_prob_from_decimal, edge, label_edge, clamp
+import http_client, state
+import sys
+from config import API_BASEBALL_KEY, CACHE_TTL_FIXTURES, CACHE_TTL_ODDS, ODDS_BULK, MLB_LEAGUE_ID, MLB_MAX_PICKS_PER_GAME, MLB_DEFAULT_TOTALS
+from odds import OddsIndex
+from picks import Pick
+import ranking
+from sports import Provider
+from utils import edge, clamp, as_date, utc_window_for_local_day, parse_api_dt, local_tz
 
 HEADERS_MLB = {
     "x-rapidapi-key": API_BASEBALL_KEY,
@@ -13,41 +16,55 @@ HEADERS_MLB = {
 }
 
 def _tz():
-    return zoneinfo.ZoneInfo(TIMEZONE)
+    return local_tz()
 
-def _localize(dt_str):
-    dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-    return dt.astimezone(_tz())
+def _games_on_utc_date(iso_day):
+    url = "https://api-baseball.p.rapidapi.com/games"
+    params = {"date": iso_day, "league": MLB_LEAGUE_ID, "season": int(iso_day[:4])}
+    return http_client.get_json(url, headers=HEADERS_MLB, params=params, ttl=CACHE_TTL_FIXTURES).get("response", [])
+
+def get_games_for(day=None, strict=False):
+    """
+    Juegos MLB cuyo inicio cae en `day` (fecha local TIMEZONE); cubre 1–2
+    fechas UTC en paralelo. Una fecha que falla se avisa y se omite
+    (strict=True: RuntimeError, el slate no está completo).
+    """
+    day = as_date(day, _tz())
+    start, end, utc_days = utc_window_for_local_day(day, _tz())
+    isos = [d.isoformat() for d in utc_days]
+    pages = http_client.fetch_many(_games_on_utc_date, isos)
+    games, seen = [], set()
+    for iso in isos:
+        data = pages.get(iso)
+        if data is None:
+            if strict:
+                raise RuntimeError(f"juegos MLB: fecha {iso} sin datos")
+            print(f"WARN juegos MLB: fecha {iso} sin datos", file=sys.stderr)
+            continue
+        for g in data:
+            if g["id"] in seen or not (start <= parse_api_dt(g["date"]) < end):
+                continue
+            seen.add(g["id"])
+            games.append(g)
+    return games
 
 def get_today_games():
-    url = "https://api-baseball.p.rapidapi.com/games"
-    params = {"date": datetime.now(timezone.utc).date().isoformat(), "league": "MLB"}
-    r = requests.get(url, headers=HEADERS_MLB, params=params, timeout=30)
-    r.raise_for_status()
-    return r.json().get("response", [])
+    return get_games_for(None)
 
-def get_odds(game_id):
+def get_odds(game_id, ttl=CACHE_TTL_ODDS):
     url = "https://api-baseball.p.rapidapi.com/odds"
     params = {"game": game_id, "bookmaker": 8}
-    r = requests.get(url, headers=HEADERS_MLB, params=params, timeout=30)
-    if r.status_code != 200:
+    try:
+        return http_client.get_json(url, headers=HEADERS_MLB, params=params, ttl=ttl).get("response", [])
+    except Exception:
         return None
-    return r.json().get("response", [])
 
 def _get_market(odds, name, value_key):
     if not odds:
         return None
-    for x in odds:
-        for bk in x.get("bookmakers", []):
-            for bet in bk.get("bets", []):
-                if bet.get("name") == name:
-                    for v in bet.get("values", []):
-                        if v.get("value") == value_key and v.get("odd"):
-                            try:
-                                return float(v["odd"])
-                            except Exception:
-                                pass
-    return None
+    if not isinstance(odds, OddsIndex):
+        odds = OddsIndex(odds)
+    return odds.price(name, value_key)
 
 def quick_pitch_rating(team):
     # Muy simple: si existe ERA abridor, bullpen ERA; si no, defaults
@@ -64,13 +81,53 @@ def quick_pitch_rating(team):
     # rating más bajo = mejor
     return clamp(5.0 - ( (4.5 - sp_era)*0.8 + (4.3 - bullpen)*0.2 ), 2.0, 8.0)
 
-def analyze_game(g):
+def prefetch_odds(games, ttl=CACHE_TTL_ODDS):
+    """Descarga en paralelo los momios de todos los juegos -> {game_id: odds}."""
+    return http_client.fetch_many(lambda gid: get_odds(gid, ttl), [g["id"] for g in games])
+
+def _bulk_odds_group(key, ttl=CACHE_TTL_ODDS):
+    league, season = key
+    url = "https://api-baseball.p.rapidapi.com/odds"
+    params = {"league": league, "season": season, "bookmaker": 8}
+    return list(http_client.iter_pages(url, headers=HEADERS_MLB, params=params, ttl=ttl))
+
+def get_odds_bulk(games, ttl=CACHE_TTL_ODDS):
+    """
+    Momios de todos los juegos con una consulta /odds por (liga, temporada)
+    (API-Baseball solo publica momios de juegos próximos). Devuelve
+    {game_id: odds}; si un grupo falla se piden juego a juego.
+    """
+    groups = {}
+    for g in games:
+        lg = g.get("league", {})
+        groups.setdefault((lg.get("id"), lg.get("season")), []).append(g)
+    keys = [k for k in groups if k[0] is not None and k[1] is not None]
+    pages = http_client.fetch_many(lambda k: _bulk_odds_group(k, ttl), keys)
+
+    wanted = {g["id"] for g in games}
+    out, missing = {}, []
+    for key, gs in groups.items():
+        items = pages.get(key)
+        if items is None:
+            missing.extend(gs)
+            continue
+        for item in items:
+            gid = item.get("game", {}).get("id")
+            if gid in wanted:
+                out.setdefault(gid, []).append(item)
+    if missing and not http_client.expired():
+        out.update(prefetch_odds(missing, ttl))
+    return out
+
+def analyze_game(g, odds=None):
     gid = g["id"]
     home = g["teams"]["home"]["name"]
     away = g["teams"]["away"]["name"]
-    dt_local = _localize(g["date"])
+    kickoff = parse_api_dt(g["date"])
 
-    odds = get_odds(gid)
+    if odds is None:
+        odds = get_odds(gid)
+    odds = OddsIndex(odds)
     dec_home = _get_market(odds, "Moneyline", "Home")
     dec_away = _get_market(odds, "Moneyline", "Away")
     dec_spread_home = _get_market(odds, "Spread", "Home -1.5")
@@ -100,30 +157,20 @@ def analyze_game(g):
     ml_cands.sort(key=lambda x: (x[3] if x[3] is not None else -9), reverse=True)
     if ml_cands:
         k,p,dec,e = ml_cands[0]
-        picks.append({
-            "type": k, "home": home, "away": away, "dt_local": dt_local,
-            "odds_dec": dec, "odds_amer": decimal_to_american(dec),
-            "edge": e, "edge_label": label_edge(e),
-            "note": "Basado en abridor/bullpen y ventaja local."
-        })
+        picks.append(Pick(gid, home, away, kickoff, k, "Moneyline", k.split()[-1], dec, e,
+                          note="Basado en abridor/bullpen y ventaja local.", prob=p))
 
     # Spread -1.5 del favorito si su prob > 58%
     if p_home > 0.58 and dec_spread_home:
-        e = edge(p_home*0.55, dec_spread_home)  # aprox prob cubrir -1.5
-        picks.append({
-            "type": "Spread Home -1.5", "home": home, "away": away, "dt_local": dt_local,
-            "odds_dec": dec_spread_home, "odds_amer": decimal_to_american(dec_spread_home),
-            "edge": e, "edge_label": label_edge(e),
-            "note": "Favorito con buena prob de cubrir."
-        })
+        p_cover = p_home * 0.55  # aprox prob cubrir -1.5
+        e = edge(p_cover, dec_spread_home)
+        picks.append(Pick(gid, home, away, kickoff, "Spread Home -1.5", "Spread", "Home -1.5",
+                          dec_spread_home, e, note="Favorito con buena prob de cubrir.", prob=p_cover))
     if p_away > 0.58 and dec_spread_away:
-        e = edge(p_away*0.55, dec_spread_away)
-        picks.append({
-            "type": "Spread Away -1.5", "home": home, "away": away, "dt_local": dt_local,
-            "odds_dec": dec_spread_away, "odds_amer": decimal_to_american(dec_spread_away),
-            "edge": e, "edge_label": label_edge(e),
-            "note": "Favorito con buena prob de cubrir."
-        })
+        p_cover = p_away * 0.55
+        e = edge(p_cover, dec_spread_away)
+        picks.append(Pick(gid, home, away, kickoff, "Spread Away -1.5", "Spread", "Away -1.5",
+                          dec_spread_away, e, note="Favorito con buena prob de cubrir.", prob=p_cover))
 
     # Totales aproximados según rating de pitcheo
     # Línea estimada (menor rating -> menos carreras)
@@ -145,25 +192,56 @@ def analyze_game(g):
                 best_tot = cand
     if best_tot:
         side, line, p, dec, e = best_tot
-        picks.append({
-            "type": f"{side} {line} carreras", "home": home, "away": away, "dt_local": dt_local,
-            "odds_dec": dec, "odds_amer": decimal_to_american(dec),
-            "edge": e, "edge_label": label_edge(e),
-            "note": "Modelado por abridor/bullpen."
-        })
+        picks.append(Pick(gid, home, away, kickoff, f"{side} {line} carreras", "Totals", f"{side} {line}",
+                          dec, e, note="Modelado por abridor/bullpen.", prob=p))
 
     # Limitar picks del juego
-    picks.sort(key=lambda x: (x["edge"] if x["edge"] is not None else -9), reverse=True)
-    return picks[:MLB_MAX_PICKS_PER_GAME]
+    return ranking.top_k(picks, MLB_MAX_PICKS_PER_GAME)
 
-def analyze_today_mlb():
-    games = get_today_games()
-    allp = []
+def _slate_odds(games, prev, now, ttl=CACHE_TTL_ODDS):
+    if ODDS_BULK:
+        return get_odds_bulk(games, ttl)
+    odds_map, pending = {}, []
     for g in games:
-        allp.extend(analyze_game(g))
-    allp.sort(key=lambda x: (x["edge"] if x["edge"] is not None else -9), reverse=True)
-    return allp
-    # --- Backwards-compat alias (para que no se caiga Railway) ---
-def analyze_mlb_for(day: str | None = None):
-    """Compat: ignora el parámetro y analiza los juegos de HOY."""
-    return analyze_today_mlb()
\ No newline at end of file
+        snap = state.reusable_odds(prev, g["id"], parse_api_dt(g["date"]), now)
+        if snap is None:
+            pending.append(g)
+        else:
+            odds_map[g["id"]] = snap
+    odds_map.update(prefetch_odds(pending, ttl))
+    return odds_map
+
+def analyze_games(pairs, point_in_time=False):
+    """Versión batch de analyze_game: pairs = [(juego, odds)] -> [[picks]]."""
+    return [analyze_game(g, o) for g, o in pairs]
+
+def final_score(g):
+    """(carreras local, carreras visita) si el juego terminó; si no, None."""
+    if g.get("status", {}).get("short") not in ("FT", "AOT"):
+        return None
+    sc = g.get("scores", {})
+    return sc.get("home", {}).get("total"), sc.get("away", {}).get("total")
+
+PROVIDER = Provider(
+    key="mlb", name="MLB",
+    fetch=get_games_for,
+    item_id=lambda g: g["id"],
+    kickoff=lambda g: parse_api_dt(g["date"]),
+    odds=_slate_odds,
+    model=analyze_games,
+    odds_one=get_odds,
+    result=final_score,
+    quota_url="https://api-baseball.p.rapidapi.com/odds",
+)
+
+def analyze_mlb_for(day=None, deadline=None, limit=None):
+    """
+    Analiza los juegos MLB del día local `day` (date o 'YYYY-MM-DD'; None = hoy).
+    Incremental: reusa los picks de la corrida anterior si los momios no se movieron.
+    deadline (time.monotonic): devuelve parciales si las descargas no llegan a tiempo.
+    limit: solo los mejores `limit` picks.
+    """
+    return PROVIDER.analyze(day, deadline, limit)
+
+def analyze_today_mlb():
+    return analyze_mlb_for(None)
@@ -0,0 +1,63 @@
+# =======================
+# SERPICKS – ODDS INDEX
+# =======================
+from config import ODDS_BEST_PRICE
+
+class OddsIndex:
+    """
+    Índice de momios de API-Football / API-Baseball:
+    response -> bookmakers -> bets -> values, parseado una sola vez.
+
+    - get(market, outcome): primer momio encontrado (mismo orden que el
+      escaneo lineal original), o el de un bookmaker concreto.
+    - best(market, outcome): mejor precio entre todas las casas.
+    - price(market, outcome): best() o get() según ODDS_BEST_PRICE.
+    Con all_books=False solo se guarda la primera casa por mercado/resultado.
+    """
+    __slots__ = ("_prices", "_first", "_best")
+
+    def __init__(self, odds_data, all_books=True):
+        self._prices = {}   # (bookmaker, market, outcome) -> dec
+        self._first = {}    # (market, outcome) -> dec
+        self._best = {}     # (market, outcome) -> (dec, bookmaker)
+        for x in odds_data or []:
+            for bk in x.get("bookmakers", []):
+                book = bk.get("name") or bk.get("id")
+                for bet in bk.get("bets", []):
+                    market = bet.get("name")
+                    for v in bet.get("values", []):
+                        if not v.get("odd"):
+                            continue
+                        try:
+                            dec = float(v["odd"])
+                        except Exception:
+                            continue
+                        key = (market, v.get("value"))
+                        if key not in self._first:
+                            self._first[key] = dec
+                        elif not all_books:
+                            continue
+                        self._prices.setdefault((book, market, key[1]), dec)
+                        if key not in self._best or dec > self._best[key][0]:
+                            self._best[key] = (dec, book)
+
+    def __bool__(self):
+        return bool(self._first)
+
+    def get(self, market, outcome, bookmaker=None):
+        if bookmaker is not None:
+            return self._prices.get((bookmaker, market, outcome))
+        return self._first.get((market, outcome))
+
+    def best(self, market, outcome):
+        hit = self._best.get((market, outcome))
+        return hit[0] if hit else None
+
+    def best_with_book(self, market, outcome):
+        return self._best.get((market, outcome))
+
+    def price(self, market, outcome):
+        return self.best(market, outcome) if ODDS_BEST_PRICE else self.get(market, outcome)
+
+    def bookmakers(self):
+        return sorted({str(b) for (b, _, _) in self._prices})
@@ -0,0 +1,94 @@
+# =======================
+# SERPICKS – PARLAYS
+# =======================
+# Combina picks de partidos distintos. Dos patas del mismo partido (1X2 y
+# doble oportunidad, over y ambos anotan...) están correlacionadas y el Pick
+# solo guarda probabilidades marginales, así que se excluyen: una pata por
+# partido. Con patas independientes, por unidad apostada:
+#   momio = Π d      prob. de acertar todas = Π p      EV = Π (p·d + push) - 1 = Π (1 + edge) - 1
+import heapq
+import ranking
+from utils import decimal_to_american
+from config import PARLAY_MIN_LEGS, PARLAY_MAX_LEGS, PARLAY_MIN_PROB, PARLAY_TOP_N
+
+class Parlay:
+    __slots__ = ("legs", "odds_dec", "prob", "ev")
+
+    def __init__(self, legs, odds_dec, prob, ev):
+        self.legs, self.odds_dec, self.prob, self.ev = legs, odds_dec, prob, ev
+
+    @property
+    def odds_amer(self):
+        return decimal_to_american(self.odds_dec)
+
+class _Leg:
+    __slots__ = ("game", "factor", "prob", "dec", "item")
+
+    def __init__(self, game, factor, prob, dec, item):
+        self.game, self.factor, self.prob, self.dec, self.item = game, factor, prob, dec, item
+
+def _legs(candidates):
+    """Patas con edge positivo: (deporte, Pick) -> _Leg, de mayor a menor factor (1 + edge)."""
+    out = []
+    for idx, (sport, p) in enumerate(candidates):
+        prob = p.win_prob
+        if p.edge is None or p.edge <= 0 or not p.odds_dec or p.odds_dec <= 1 or not prob:
+            continue
+        out.append((-(1.0 + p.edge), ranking.pick_tie(p), idx,
+                    _Leg((sport, p.fixture_id), 1.0 + p.edge, prob, p.odds_dec, (sport, p))))
+    out.sort(key=lambda t: t[:3])
+    return [t[3] for t in out]
+
+def build(candidates, n=PARLAY_TOP_N, min_legs=PARLAY_MIN_LEGS, max_legs=PARLAY_MAX_LEGS,
+          min_prob=PARLAY_MIN_PROB):
+    """
+    Los `n` mejores parlays por EV entre `candidates` [(deporte, Pick)], de
+    min_legs a max_legs patas, sin dos patas del mismo partido y con prob.
+    conjunta >= min_prob. Branch-and-bound: las patas van por factor
+    descendente, así que la cota de una rama es su factor por el de las
+    siguientes `faltan` patas; en cuanto no supera al peor del top-n, ni esa
+    rama ni las siguientes pueden entrar.
+    """
+    legs = _legs(candidates)
+    factors = [leg.factor for leg in legs]
+    best = []       # min-heap (ev, -orden, patas): el peor del top-n arriba
+    seq = [0]
+
+    def bound(j, left):
+        b = 1.0
+        for f in factors[j:j + left]:
+            b *= f
+        return b
+
+    def search(start, chosen, games, factor, prob):
+        if chosen and len(chosen) >= min_legs:
+            seq[0] += 1
+            entry = (factor - 1.0, -seq[0], tuple(chosen), prob)
+            if len(best) < n:
+                heapq.heappush(best, entry)
+            elif entry[:2] > best[0][:2]:
+                heapq.heapreplace(best, entry)
+        left = max_legs - len(chosen)
+        if left <= 0:
+            return
+        for j in range(start, len(legs)):
+            if len(best) >= n and factor * bound(j, left) - 1.0 <= best[0][0]:
+                break
+            leg = legs[j]
+            if leg.game in games or prob * leg.prob < min_prob:
+                continue
+            chosen.append(leg)
+            games.add(leg.game)
+            search(j + 1, chosen, games, factor * leg.factor, prob * leg.prob)
+            games.discard(leg.game)
+            chosen.pop()
+
+    if n > 0 and max_legs >= min_legs:
+        search(0, [], set(), 1.0, 1.0)
+    out = []
+    for ev, _, chosen, prob in sorted(best, reverse=True):
+        dec = 1.0
+        for leg in chosen:
+            dec *= leg.dec
+        out.append(Parlay([leg.item for leg in chosen], round(dec, 2), prob, ev))
+    return out
@@ -0,0 +1,109 @@
+# =======================
+# SERPICKS – PICK
+# =======================
+from utils import decimal_to_american, label_edge, local_tz, parse_api_dt
+
+class Pick:
+    """
+    Pick compacto común a fútbol y MLB (slots, sin __dict__). Lo derivado
+    (momio americano, etiqueta de edge, hora local) se calcula al leerlo,
+    o sea solo para los picks que llegan a mostrarse. Se lee como el dict
+    de siempre (get, [], in, keys, dict(p)); to_dict() da la copia plana.
+    kickoff: datetime tz-aware, compartido por los picks del mismo partido.
+    """
+    __slots__ = ("fixture_id", "league", "home", "away", "kickoff", "exp_goals",
+                 "type", "market", "outcome", "odds_dec", "edge", "note", "prob", "push")
+
+    # Claves visibles como dict, en el orden del formato anterior
+    FIELDS = ("fixture_id", "league", "home", "away", "dt_local", "exp_goals", "type", "market",
+              "outcome", "odds_dec", "odds_amer", "edge", "edge_label", "note", "prob", "push")
+    _STORED = ("fixture_id", "league", "home", "away", "dt_local", "exp_goals", "type", "market",
+               "outcome", "odds_dec", "edge", "note", "prob", "push")
+
+    def __init__(self, fixture_id, home, away, kickoff, type, market, outcome, odds_dec, edge,
+                 note=None, league=None, exp_goals=None, prob=None, push=None):
+        self.fixture_id = fixture_id
+        self.league = league
+        self.home = home
+        self.away = away
+        self.kickoff = kickoff
+        self.exp_goals = exp_goals
+        self.type = type
+        self.market = market
+        self.outcome = outcome
+        self.odds_dec = odds_dec
+        self.edge = edge
+        self.note = note
+        self.prob = prob    # prob. del modelo de ganar el pick
+        self.push = push    # prob. de que se devuelva el stake (líneas enteras/asiáticas)
+
+    @property
+    def win_prob(self):
+        """Prob. del modelo de ganar el pick; en picks viejos sin prob guardada se despeja del edge."""
+        if self.prob is not None:
+            return self.prob
+        if self.edge is None or not self.odds_dec:
+            return None
+        return (self.edge + 1.0 - (self.push or 0.0)) / self.odds_dec
+
+    def edge_at(self, dec):
+        """Edge del pick con otro momio decimal (la prob. del modelo no cambia)."""
+        prob = self.win_prob
+        if prob is None:
+            return None
+        return prob * dec + (self.push or 0.0) - 1.0
+
+    # ---- derivados (perezosos) ----
+    @property
+    def dt_local(self):
+        try:
+            return self.kickoff.astimezone(local_tz())
+        except Exception:
+            return self.kickoff
+
+    @property
+    def odds_amer(self):
+        return decimal_to_american(self.odds_dec)
+
+    @property
+    def edge_label(self):
+        return label_edge(self.edge)
+
+    # ---- compatibilidad con dict ----
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        v = getattr(self, key) if key in self.FIELDS else None
+        return default if v is None else v
+
+    def __contains__(self, key):
+        return key in self.FIELDS and getattr(self, key) is not None
+
+    def keys(self):
+        return [k for k in self.FIELDS if k in self]
+
+    def to_dict(self, derived=True):
+        """Dict plano; derived=False omite momio americano y etiqueta (se recalculan)."""
+        fields = self.FIELDS if derived else self._STORED
+        return {k: getattr(self, k) for k in fields if getattr(self, k) is not None}
+
+    @classmethod
+    def from_dict(cls, d):
+        if isinstance(d, cls):
+            return d
+        kickoff = d.get("dt_local")
+        if isinstance(kickoff, str):
+            try:
+                kickoff = parse_api_dt(kickoff)
+            except Exception:
+                pass
+        return cls(d.get("fixture_id"), d.get("home"), d.get("away"), kickoff, d.get("type"),
+                   d.get("market"), d.get("outcome"), d.get("odds_dec"), d.get("edge"),
+                   note=d.get("note"), league=d.get("league"), exp_goals=d.get("exp_goals"),
+                   prob=d.get("prob"), push=d.get("push"))
+
+    def __repr__(self):
+        return f"Pick({self.fixture_id}, {self.type!r}, dec={self.odds_dec}, edge={self.edge})"
@@ -0,0 +1,191 @@
+# =======================
+# SERPICKS – BATCH PRICING (FÚTBOL)
+# =======================
+from math import lgamma
+import numpy as np
+from config import DEFAULT_GOALS_LINES, MAX_PICKS_PER_MATCH, GOALS_MAX, GOALS_COVARIANCE, GOALS_LAMBDA_STEP
+
+# Grupos de mercado en el orden en que analyze_fixture emite los picks
+GROUP_1X2, GROUP_DC, GROUP_OU, GROUP_BTTS = 0, 1, 2, 3
+N_GROUPS = 4
+
+EDGE_LABELS = np.array(["MUY FUERTE", "Fuerte", "Moderado", "Ligero", "Sin valor", "N/A"], dtype=object)
+
+def columns(lines=DEFAULT_GOALS_LINES):
+    """
+    Columnas de la matriz de momios: (grupo, etiqueta, mercado API, resultado API, línea).
+    1X2 y doble oportunidad primero; después Over/Under por línea y BTTS.
+    """
+    cols = [
+        (GROUP_1X2, "Local", "Match Winner", "Home", None),
+        (GROUP_1X2, "Empate", "Match Winner", "Draw", None),
+        (GROUP_1X2, "Visitante", "Match Winner", "Away", None),
+        (GROUP_DC, "1X", "Double Chance", "1X", None),
+        (GROUP_DC, "12", "Double Chance", "12", None),
+        (GROUP_DC, "X2", "Double Chance", "X2", None),
+    ]
+    for line in lines:
+        cols.append((GROUP_OU, "Over", "Goals Over/Under", f"Over {line}", line))
+        cols.append((GROUP_OU, "Under", "Goals Over/Under", f"Under {line}", line))
+    cols.append((GROUP_BTTS, "Sí", "Both Teams Score", "Yes", None))
+    cols.append((GROUP_BTTS, "No", "Both Teams Score", "No", None))
+    return cols
+
+def odds_matrix(indexes, lines=DEFAULT_GOALS_LINES):
+    """(n_fixtures, n_columnas) de momios decimales desde OddsIndex; NaN = sin momio."""
+    cols = columns(lines)
+    out = np.full((len(indexes), len(cols)), np.nan)
+    for i, idx in enumerate(indexes):
+        if not idx:
+            continue
+        for j, (_, _, market, outcome, _) in enumerate(cols):
+            dec = idx.price(market, outcome)
+            if dec:
+                out[i, j] = dec
+    return out
+
+# ----------------- Matriz de marcadores -----------------
+# Caché por (λh, λa) redondeados -> fila de resumen:
+# [P(local), P(empate), P(visita), P(ambos anotan), P(total=0..2*GOALS_MAX)]
+_SUMMARY_CACHE = {}
+_SUMMARY_CACHE_MAX = 200_000
+_LGAMMA = np.array([lgamma(k + 1) for k in range(GOALS_MAX + 1)])
+
+def _poisson_pmf(lam):
+    """(u,) -> (u, GOALS_MAX+1)."""
+    k = np.arange(GOALS_MAX + 1)
+    lam = np.maximum(lam, 1e-9)[:, None]
+    return np.exp(k * np.log(lam) - lam - _LGAMMA)
+
+def score_matrices(lam_h, lam_a, cov=GOALS_COVARIANCE):
+    """
+    Matrices de marcadores (u, G+1, G+1) para cada par (λh, λa).
+    cov > 0 -> Poisson bivariado: X = X1 + X3, Y = X2 + X3 con X3 ~ Pois(cov),
+    así que las medias siguen siendo λh y λa. Se renormaliza el truncamiento.
+    """
+    lam_h = np.asarray(lam_h, dtype=float)
+    lam_a = np.asarray(lam_a, dtype=float)
+    c = np.minimum(cov, 0.9 * np.minimum(lam_h, lam_a))
+    p1, p2 = _poisson_pmf(lam_h - c), _poisson_pmf(lam_a - c)
+    if not np.any(c > 0):
+        m = p1[:, :, None] * p2[:, None, :]
+    else:
+        p3 = _poisson_pmf(c)
+        g = GOALS_MAX + 1
+        m = np.zeros((len(lam_h), g, g))
+        for k in range(g):
+            m[:, k:, k:] += p3[:, k, None, None] * p1[:, :g - k, None] * p2[:, None, :g - k]
+    return m / m.sum(axis=(1, 2), keepdims=True)
+
+def _summaries(m):
+    g = m.shape[1]
+    i, j = np.indices((g, g))
+    home = (m * (i > j)).sum(axis=(1, 2))
+    draw = (m * (i == j)).sum(axis=(1, 2))
+    away = (m * (i < j)).sum(axis=(1, 2))
+    btts = m[:, 1:, 1:].sum(axis=(1, 2))
+    totals = np.zeros((m.shape[0], 2 * g - 1))
+    for t in range(2 * g - 1):
+        totals[:, t] = (m * (i + j == t)).sum(axis=(1, 2))
+    return np.column_stack([home, draw, away, btts, totals])
+
+def score_summaries(lam_h, lam_a):
+    """
+    Resúmenes de la matriz para cada fixture; (λh, λa) se redondean a
+    GOALS_LAMBDA_STEP y solo se calculan (en lote) los pares que no están en caché.
+    """
+    step = GOALS_LAMBDA_STEP
+    qh = np.rint(np.clip(np.asarray(lam_h, dtype=float), 0.05, 6.0) / step).astype(int)
+    qa = np.rint(np.clip(np.asarray(lam_a, dtype=float), 0.05, 6.0) / step).astype(int)
+    keys = list(zip(qh.tolist(), qa.tolist()))
+    missing = list({k for k in keys if k not in _SUMMARY_CACHE})
+    if missing:
+        if len(_SUMMARY_CACHE) + len(missing) > _SUMMARY_CACHE_MAX:
+            _SUMMARY_CACHE.clear()
+            missing = list(set(keys))
+        arr = np.array(missing, dtype=float) * step
+        for k, row in zip(missing, _summaries(score_matrices(arr[:, 0], arr[:, 1]))):
+            _SUMMARY_CACHE[k] = row
+    return np.array([_SUMMARY_CACHE[k] for k in keys]).reshape(len(keys), -1)
+
+def _line_probs(totals, line, over):
+    """
+    (p_gana, p_devuelve) de Over/Under `line` sobre la distribución de goles totales.
+    Líneas enteras devuelven el stake si el total iguala la línea; las de
+    cuarto (2.25, 2.75...) se parten en dos medias apuestas.
+    """
+    if round(line * 4) % 2 == 1:
+        w1, p1 = _line_probs(totals, line - 0.25, over)
+        w2, p2 = _line_probs(totals, line + 0.25, over)
+        return 0.5 * (w1 + w2), 0.5 * (p1 + p2)
+    t = np.arange(totals.shape[1])
+    win = totals[:, t > line] if over else totals[:, t < line]
+    push = totals[:, t == line] if float(line).is_integer() else totals[:, :0]
+    return win.sum(axis=1), push.sum(axis=1)
+
+def model_probs(exp_h, exp_a, lines=DEFAULT_GOALS_LINES):
+    """
+    Probabilidades del modelo para cada columna de columns(lines), todas
+    desde una matriz de marcadores por fixture. Devuelve (p_gana, p_devuelve,
+    exp_total); p_devuelve solo es > 0 en líneas asiáticas.
+    """
+    exp_h = np.asarray(exp_h, dtype=float)
+    exp_a = np.asarray(exp_a, dtype=float)
+    exp_total = np.clip(exp_h + exp_a, 0.5, 5.0)
+    s = score_summaries(exp_h, exp_a)
+    p_home, p_draw, p_away, btts, totals = s[:, 0], s[:, 1], s[:, 2], s[:, 3], s[:, 4:]
+    zero = np.zeros_like(p_home)
+    win = [p_home, p_draw, p_away, p_home + p_draw, p_home + p_away, p_draw + p_away]
+    push = [zero] * 6
+    for line in lines:
+        for over in (True, False):
+            w, p = _line_probs(totals, line, over)
+            win.append(w)
+            push.append(p)
+    win.extend([btts, 1 - btts])
+    push.extend([zero, zero])
+    return np.column_stack(win), np.column_stack(push), exp_total
+
+def label_edges(edges):
+    """utils.label_edge vectorizado (NaN -> 'N/A')."""
+    e = np.nan_to_num(edges, nan=-np.inf)
+    choice = np.select([e >= 0.10, e >= 0.05, e >= 0.01, e > 0, np.isfinite(e)], [0, 1, 2, 3, 4], default=5)
+    return EDGE_LABELS[choice]
+
+def price_slate(exp_h, exp_a, odds, lines=DEFAULT_GOALS_LINES, k=MAX_PICKS_PER_MATCH):
+    """
+    Precio de todo el slate (fixtures × mercados × líneas) en una pasada.
+    exp_h, exp_a: (n,) goles esperados; odds: odds_matrix(...).
+    Devuelve dict de arrays:
+      prob, push, edge (n, cols) · best_col, best_edge, labels (n, grupos)
+      keep (n, grupos): top-k por partido según edge · exp_total (n,)
+    """
+    exp_h = np.asarray(exp_h, dtype=float)
+    exp_a = np.asarray(exp_a, dtype=float)
+    prob, push, exp_total = model_probs(exp_h, exp_a, lines)
+    edge = prob * odds + push - 1.0                # NaN donde no hay momio; push = stake devuelto
+
+    groups = np.array([c[0] for c in columns(lines)])
+    n = len(exp_h)
+    best_col = np.full((n, N_GROUPS), -1)
+    best_edge = np.full((n, N_GROUPS), np.nan)
+    masked = np.where(np.isnan(edge), -np.inf, edge)
+    for g in range(N_GROUPS):
+        cols_g = np.flatnonzero(groups == g)
+        sub = masked[:, cols_g]
+        arg = sub.argmax(axis=1)                   # primer máximo = mismo desempate que el escaneo
+        has = np.isfinite(sub[np.arange(n), arg])
+        best_col[has, g] = cols_g[arg[has]]
+        best_edge[has, g] = sub[np.arange(n), arg][has]
+
+    # top-k por partido: máscara de los k grupos con mejor edge (se emiten en orden de grupo)
+    rank = np.argsort(-np.nan_to_num(best_edge, nan=-np.inf), axis=1, kind="stable")[:, :k]
+    keep = np.zeros((n, N_GROUPS), dtype=bool)
+    np.put_along_axis(keep, rank, True, axis=1)
+    keep &= best_col >= 0
+
+    return {
+        "prob": prob, "push": push, "edge": edge, "exp_total": exp_total,
+        "best_col": best_col, "best_edge": best_edge,
+        "labels": label_edges(best_edge), "keep": keep,
+    }
@@ -0,0 +1,87 @@
+# =======================
+# SERPICKS – RANKING (TOP-K)
+# =======================
+import heapq, threading
+from itertools import count
+
+def edge_of(p):
+    e = p.get("edge")
+    return e if e is not None else -9
+
+def pick_tie(p):
+    """Desempate determinista: kickoff más temprano, luego fixture, mercado y resultado."""
+    dt = getattr(p, "kickoff", None) or p.get("dt_local")
+    try:
+        ts = dt.timestamp()
+    except Exception:
+        ts = 0.0
+    fid = p.get("fixture_id")
+    return (ts, fid if isinstance(fid, int) else 0, p.get("market") or "", p.get("outcome") or "")
+
+class _Rev:
+    """Invierte la comparación: en el heap mínimo, el desempate 'menor' es el que se conserva."""
+    __slots__ = ("v",)
+
+    def __init__(self, v):
+        self.v = v
+
+    def __lt__(self, other):
+        return other.v < self.v
+
+    def __eq__(self, other):
+        return self.v == other.v
+
+class TopK:
+    """
+    Los k mejores elementos por score (desc) en un heap acotado: memoria O(k)
+    aunque entren cientos de miles. Empates: gana el `tie` menor y, si también
+    empata, el que llegó primero. k=None = sin límite. Seguro entre hilos.
+    """
+    __slots__ = ("k", "score", "tie", "_heap", "_seq", "_lock")
+
+    def __init__(self, k=None, score=edge_of, tie=pick_tie):
+        self.k, self.score, self.tie = k, score, tie
+        self._heap = []
+        self._seq = count()
+        self._lock = threading.Lock()
+
+    def push(self, item, tie=None):
+        if self.k is not None and self.k <= 0:
+            return
+        tie = self.tie(item) if tie is None else tie
+        entry = (self.score(item), _Rev((tie, next(self._seq))), item)
+        with self._lock:
+            if self.k is None or len(self._heap) < self.k:
+                heapq.heappush(self._heap, entry)
+            elif entry[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, entry)
+
+    def extend(self, items):
+        for it in items:
+            self.push(it)
+        return self
+
+    def sorted(self):
+        with self._lock:
+            entries = list(self._heap)
+        entries.sort(key=lambda e: e[:2], reverse=True)
+        return [e[2] for e in entries]
+
+    def __len__(self):
+        return len(self._heap)
+
+def top_k(items, k=None, score=edge_of, tie=pick_tie):
+    """Los k mejores de un iterable (p. ej. un generador de picks), ya ordenados."""
+    return TopK(k, score, tie).extend(items).sorted()
+
+def merge_top(groups, k=None):
+    """
+    groups: [(etiqueta, picks)] en el orden de los deportes -> [(etiqueta, pick)]
+    top-k por edge con el mismo desempate que el mensaje del día (orden del
+    deporte, luego pick_tie); así se reconstruye qué se publicó.
+    """
+    top = TopK(k, score=lambda x: edge_of(x[1]))
+    for idx, (label, picks) in enumerate(groups):
+        for p in picks:
+            top.push((label, p), tie=(idx,) + pick_tie(p))
+    return top.sorted()
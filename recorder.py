@@ -0,0 +1,105 @@
+# =======================
+# SERPICKS – RECORD / REPLAY
+# =======================
+import hashlib, json, os, random, tempfile, threading, time
+from config import RECORD_DIR, REPLAY_LATENCY_MS, REPLAY_JITTER_MS, REPLAY_ERROR_RATE
+from cache import DiskCache
+
+class FakeResponse:
+    """Lo mínimo de requests.Response que usa el código (status, headers, json)."""
+    def __init__(self, status_code, data=None, headers=None, url=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.url = url
+        self._data = data
+        self.content = json.dumps(data).encode() if data is not None else b""
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} (replay) for {self.url}", response=self)
+
+def _key(method, url, params=None, body=None):
+    # Telegram lleva el token en la URL: se normaliza para no guardarlo
+    if "api.telegram.org/bot" in url:
+        url = "https://api.telegram.org/bot<token>/" + url.rsplit("/", 1)[-1]
+    key = method + " " + DiskCache.make_key(url, params)
+    if body is not None:
+        key += " " + json.dumps(body, sort_keys=True, default=str)[:200]
+    return key
+
+def _file(key, path):
+    return os.path.join(path, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+def save(method, url, params, body, resp, path=None):
+    """Guarda una respuesta real (modo record)."""
+    path = path or RECORD_DIR
+    try:
+        data = resp.json()
+    except Exception:
+        data = None
+    entry = {"key": _key(method, url, params, body), "status": resp.status_code,
+             "headers": {k: v for k, v in resp.headers.items() if k.lower().startswith(("x-ratelimit", "retry-after"))},
+             "data": data}
+    try:
+        os.makedirs(path, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(entry, fh)
+        os.replace(tmp, _file(entry["key"], path))
+    except Exception:
+        pass
+
+class StandIn:
+    """
+    Sustituto local de RapidAPI y Telegram (modo replay). Responde desde las
+    grabaciones; si no hay, prueba `fallback(method, url, params, body)`
+    (los benchmarks generan slates sintéticos así). Inyecta latencia y errores
+    503 según REPLAY_*. Cuenta peticiones por endpoint.
+    """
+    def __init__(self, path=None, latency_ms=REPLAY_LATENCY_MS, jitter_ms=REPLAY_JITTER_MS,
+                 error_rate=REPLAY_ERROR_RATE, fallback=None):
+        self.path = path or RECORD_DIR
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.fallback = fallback
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def handle(self, method, url, params=None, body=None):
+        endpoint = url.split("?")[0].rsplit("/", 1)[-1]
+        with self._lock:
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+        delay = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if self.error_rate and random.random() < self.error_rate:
+            return FakeResponse(503, {"message": "injected error"}, url=url)
+        try:
+            with open(_file(_key(method, url, params, body), self.path), encoding="utf-8") as fh:
+                entry = json.load(fh)
+            return FakeResponse(entry["status"], entry.get("data"), entry.get("headers"), url=url)
+        except FileNotFoundError:
+            pass
+        if self.fallback is not None:
+            hit = self.fallback(method, url, params, body)
+            if hit is not None:
+                return FakeResponse(200, hit, url=url)
+        if "api.telegram.org" in url:
+            return FakeResponse(200, {"ok": True, "result": {}}, url=url)
+        return FakeResponse(404, {"message": "not recorded"}, url=url)
+
+    def total(self):
+        return sum(self.counts.values())
+
+_standin = None
+
+def standin():
+    global _standin
+    if _standin is None:
+        _standin = StandIn()
+    return _standin
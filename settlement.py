@@ -0,0 +1,51 @@
+# =======================
+# SERPICKS – SETTLEMENT
+# =======================
+
+def _line_outcome(total, line, over):
+    """(gana, devuelve) para una línea simple (x.5 o entera)."""
+    if total == line:
+        return 0.0, 1.0
+    won = total > line if over else total < line
+    return (1.0, 0.0) if won else (0.0, 0.0)
+
+def _totals(total, outcome):
+    side, line = outcome.split()
+    line, over = float(line), side == "Over"
+    if round(line * 4) % 2 == 1:  # línea de cuarto: dos medias apuestas
+        w1, p1 = _line_outcome(total, line - 0.25, over)
+        w2, p2 = _line_outcome(total, line + 0.25, over)
+        return 0.5 * (w1 + w2), 0.5 * (p1 + p2)
+    return _line_outcome(total, line, over)
+
+def settle(market, outcome, home, away):
+    """
+    Liquida un pick con el marcador final (goles o carreras).
+    Devuelve (fracción ganada, fracción devuelta) -> ganancia por unidad
+    = ganada * momio + devuelta - 1. None si el mercado no se reconoce.
+    """
+    if home is None or away is None or not market or not outcome:
+        return None
+    diff = home - away
+    if market in ("Match Winner", "Moneyline"):
+        won = {"Home": diff > 0, "Draw": diff == 0, "Away": diff < 0}.get(outcome)
+    elif market == "Double Chance":
+        won = {"1X": diff >= 0, "12": diff != 0, "X2": diff <= 0}.get(outcome)
+    elif market == "Both Teams Score":
+        won = {"Yes": home > 0 and away > 0, "No": home == 0 or away == 0}.get(outcome)
+    elif market == "Spread":
+        side, line = outcome.split()
+        margin = diff if side == "Home" else -diff
+        return _line_outcome(margin + float(line), 0.0, True)
+    elif market in ("Goals Over/Under", "Totals"):
+        return _totals(home + away, outcome)
+    else:
+        return None
+    if won is None:
+        return None
+    return (1.0, 0.0) if won else (0.0, 0.0)
+
+def profit(result, dec):
+    """Ganancia por unidad apostada dado settle(...) y el momio decimal."""
+    win, push = result
+    return win * dec + push - 1.0
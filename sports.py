@@ -0,0 +1,125 @@
+# =======================
+# SERPICKS – SPORT REGISTRY
+# =======================
+# Cada deporte es un módulo que expone PROVIDER (un Provider) y se registra en
+# SERPICKS_SPORTS ("clave:módulo,..."). El módulo se importa la primera vez que
+# se usa. Todos comparten el mismo pipeline (slate -> forma -> momios ->
+# histórico -> modelo incremental) y el mismo ranking en main. La pila HTTP,
+# el estado y el histórico también se cargan al correr el pipeline, no al importar.
+import importlib, sys
+from datetime import datetime, timezone
+import metrics
+from config import SPORT_MODULES, HISTORY_CAPTURE
+from utils import as_date, local_tz
+
+class Provider:
+    """
+    Lo que un deporte declara para entrar al pipeline común:
+      key, name                 clave de estado/histórico y nombre visible
+      fetch(day, strict=False)  slate del día local: lista de partidos crudos; strict=True
+                                levanta error si una parte del slate no se pudo descargar
+      item_id(x), kickoff(x)    id y kickoff (datetime UTC) de cada partido
+      odds(slate, prev, now, ttl)  {id: momios} de todo el slate; ttl = antigüedad máxima en caché
+      model(pairs, point_in_time=False)  [(partido, momios)] -> [[Pick]] en el mismo orden
+      odds_one(id, ttl)         momios de un solo partido (watcher)
+      result(x)                 marcador final (local, visita) o None si no terminó
+      quota_url                 endpoint cuyo header trae la cuota RapidAPI
+      prepare(slate)            opcional: datos previos al modelo (p. ej. forma)
+    """
+    __slots__ = ("key", "name", "fetch", "item_id", "kickoff", "odds", "model",
+                 "odds_one", "result", "quota_url", "prepare")
+
+    def __init__(self, key, name, fetch, item_id, kickoff, odds, model,
+                 odds_one, result, quota_url, prepare=None):
+        self.key, self.name = key, name
+        self.fetch, self.item_id, self.kickoff = fetch, item_id, kickoff
+        self.odds, self.model, self.prepare = odds, model, prepare
+        self.odds_one, self.result, self.quota_url = odds_one, result, quota_url
+
+    def iter_picks(self, day=None, deadline=None, cancel=None, odds_ttl=None):
+        """
+        Picks del día local `day` (None = hoy), sin ordenar, conforme salen del
+        modelo. Incremental: reusa los picks de la corrida anterior si los
+        momios no se movieron. deadline (time.monotonic): las descargas que no
+        lleguen a tiempo se omiten y esos partidos conservan los picks de la
+        corrida anterior. cancel (Event): quien consume ya no espera; se deja
+        de analizar y no se guarda estado. odds_ttl: antigüedad máxima de los
+        momios en caché (None = la del deporte, CACHE_TTL_ODDS).
+        """
+        import http_client
+        with http_client.deadline_scope(deadline):
+            yield from self._pipeline(as_date(day, local_tz()), cancel, odds_ttl)
+
+    def analyze(self, day=None, deadline=None, limit=None):
+        """iter_picks ya ordenado por edge (solo los mejores `limit`)."""
+        import ranking
+        return ranking.top_k(self.iter_picks(day, deadline), limit)
+
+    def _pipeline(self, day, cancel=None, odds_ttl=None):
+        import http_client, state, history
+        k = self.key
+        stopped = lambda: cancel is not None and cancel.is_set()
+        with metrics.span(f"{k}.fetch_fixtures"):
+            slate = self.fetch(day)
+        if self.prepare and not stopped():
+            try:
+                with metrics.span(f"{k}.prepare"):
+                    self.prepare(slate)
+            except Exception as e:
+                print(f"WARN {self.name} (preparación):", e, file=sys.stderr)
+        prev = state.load(k, day)
+        with metrics.span(f"{k}.fetch_odds"):
+            now = datetime.now(timezone.utc)
+            odds_map = (self.odds(slate, prev, now) if odds_ttl is None
+                        else self.odds(slate, prev, now, ttl=odds_ttl))
+        partial = http_client.expired()   # el deadline cortó slate o momios: no es una corrida completa
+        if stopped():
+            return
+        items = [(self.item_id(x), self.kickoff(x), x) for x in slate]
+        if HISTORY_CAPTURE:
+            try:
+                history.capture_slate(k, day, items, odds_map)
+            except Exception as e:
+                print("WARN histórico:", e, file=sys.stderr)
+        # El span del modelo mide solo el cálculo, no el tiempo del consumidor entre picks
+        stream = state.iter_incremental(k, day, prev, items, odds_map, self.model,
+                                        partial=partial, cancel=cancel)
+        while True:
+            with metrics.span(f"{k}.model"):
+                nxt = next(stream, None)
+            if nxt is None:
+                return
+            yield from nxt[1]
+
+# ----------------- Registro -----------------
+_providers = {}
+
+def _spec(spec=SPORT_MODULES):
+    out = []
+    for item in spec.split(","):
+        key, _, module = item.strip().partition(":")
+        if key:
+            out.append((key, module or key))
+    return out
+
+def keys():
+    return [k for k, _ in _spec()]
+
+def get(key):
+    """Provider registrado bajo `key` (importa su módulo la primera vez)."""
+    if key not in _providers:
+        module = dict(_spec()).get(key)
+        if module is None:
+            raise KeyError(f"deporte no registrado: {key}")
+        _providers[key] = importlib.import_module(module).PROVIDER
+    return _providers[key]
+
+def enabled():
+    """Providers de SERPICKS_SPORTS en orden; uno que no carga se avisa y se omite."""
+    out = []
+    for key in keys():
+        try:
+            out.append(get(key))
+        except Exception as e:
+            print(f"WARN deporte {key}: no disponible:", e, file=sys.stderr)
+    return out
@@ -0,0 +1,210 @@
+# =======================
+# SERPICKS – RUN STATE
+# =======================
+import json, os, tempfile, time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+try:
+    import fcntl
+except ImportError:  # Windows: sin candado entre procesos
+    fcntl = None
+from picks import Pick
+from config import STATE_DIR, RECHECK_KICKOFF_WINDOW_MIN, STATE_ODDS_MAX_AGE, STREAM_CHUNK, RUN_LOCK_TIMEOUT_S
+
+# Último análisis por (deporte, fecha): (picks previos {fid: [Pick]} o None, picks nuevos {fid: [Pick]}).
+# None = sin corrida comparable (primera del día o cortada por el deadline): no aporta cambios.
+LAST_RUN = {}
+# Kickoffs (UTC) del último análisis por (deporte, fecha); el daemon decide con esto los rechecks
+KICKOFFS = {}
+
+def _path(sport, day):
+    return os.path.join(STATE_DIR, f"{sport}-{day.isoformat()}.json")
+
+def _encode_pick(p):
+    q = p.to_dict(derived=False) if isinstance(p, Pick) else dict(p)
+    if isinstance(q.get("dt_local"), datetime):
+        q["dt_local"] = q["dt_local"].isoformat()
+    return q
+
+def _decode_pick(p):
+    return Pick.from_dict(p)
+
+def load(sport, day):
+    """
+    Estado persistido de la corrida anterior para (deporte, fecha):
+    {"ts", "odds_update": {fid: update}, "odds": {fid: odds}, "picks": {fid: [pick]}}.
+    Las claves fid vuelven como str (JSON).
+    """
+    try:
+        with open(_path(sport, day), encoding="utf-8") as fh:
+            st = json.load(fh)
+    except Exception:
+        return {"ts": 0, "odds_update": {}, "odds": {}, "picks": {}}
+    st["picks"] = {k: [_decode_pick(p) for p in v] for k, v in st.get("picks", {}).items()}
+    st.setdefault("odds_update", {})
+    st.setdefault("odds", {})
+    st.setdefault("kickoffs", {})
+    return st
+
+def save(sport, day, odds_update, odds, picks_by_fid, kickoffs=None):
+    kickoffs = kickoffs or {}
+    KICKOFFS[(sport, day)] = list(kickoffs.values())
+    data = {
+        "ts": time.time(),
+        "kickoffs": {str(k): v.isoformat() for k, v in kickoffs.items()},
+        "odds_update": {str(k): v for k, v in odds_update.items()},
+        "odds": {str(k): v for k, v in odds.items()},
+        "picks": {str(k): [_encode_pick(p) for p in v] for k, v in picks_by_fid.items()},
+    }
+    try:
+        os.makedirs(STATE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=STATE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, _path(sport, day))
+    except Exception:
+        pass
+
+def kickoffs_for(day):
+    """Kickoffs conocidos de `day` (todos los deportes): memoria o, si no hay, los archivos de estado."""
+    known = [k for (_, d), ks in KICKOFFS.items() if d == day for k in ks]
+    if known:
+        return known
+    suffix = f"-{day.isoformat()}.json"
+    try:
+        names = [n for n in os.listdir(STATE_DIR) if n.endswith(suffix)]
+    except OSError:
+        return []
+    for name in names:
+        try:
+            with open(os.path.join(STATE_DIR, name), encoding="utf-8") as fh:
+                raw = json.load(fh).get("kickoffs", {})
+            KICKOFFS[(name[:-len(suffix)], day)] = [datetime.fromisoformat(v) for v in raw.values()]
+        except Exception:
+            continue
+    return [k for (_, d), ks in KICKOFFS.items() if d == day for k in ks]
+
+@contextmanager
+def run_lock(timeout=RUN_LOCK_TIMEOUT_S):
+    """
+    Una corrida de análisis a la vez sobre STATE_DIR (cron, daemon o ambos
+    comparten estado y caché). Espera hasta `timeout` s; si no, TimeoutError.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(STATE_DIR, exist_ok=True)
+    with open(os.path.join(STATE_DIR, "run.lock"), "w") as fh:
+        limit = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= limit:
+                    raise TimeoutError("otra corrida de SERPICKS sigue en curso")
+                time.sleep(1)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+def odds_update_of(odds):
+    """Marca 'update' más reciente del payload de momios (None si no hay)."""
+    ups = [x.get("update") for x in odds or [] if x.get("update")]
+    return max(ups) if ups else None
+
+def diff_picks(old_items, new_items, tol=0.001, odds_tol=None):
+    """
+    Picks nuevos, desaparecidos y con edge (más de `tol`) o momio (más de
+    `odds_tol`, relativo) distinto entre dos listas de (etiqueta, Pick)
+    (identidad = etiqueta + fixture + tipo).
+    """
+    def _flat(items):
+        return {(label, p.get("fixture_id"), p.get("type")): p for label, p in items}
+    old, new = _flat(old_items), _flat(new_items)
+    added = [(k[0], new[k]) for k in new if k not in old]
+    removed = [(k[0], old[k]) for k in old if k not in new]
+    changed = []
+    for k in new.keys() & old.keys():
+        e_old, e_new = old[k].get("edge"), new[k].get("edge")
+        d_old, d_new = old[k].get("odds_dec"), new[k].get("odds_dec")
+        if ((e_old is None) != (e_new is None) or (e_old is not None and abs(e_new - e_old) > tol)
+                or (odds_tol is not None and d_old and d_new and abs(d_new / d_old - 1.0) > odds_tol)):
+            changed.append((k[0], old[k], new[k]))
+    return {"added": added, "removed": removed, "changed": changed}
+
+def record_run(sport, day, old_by_fid, new_by_fid):
+    LAST_RUN[(sport, day)] = (old_by_fid, new_by_fid)
+
+def near_kickoff(kickoff_utc, now_utc):
+    """True si el partido empieza dentro de RECHECK_KICKOFF_WINDOW_MIN (o ya empezó)."""
+    return (kickoff_utc - now_utc).total_seconds() <= RECHECK_KICKOFF_WINDOW_MIN * 60
+
+def reusable_odds(prev, fid, kickoff_utc, now_utc):
+    """Snapshot de momios reutilizable sin pedirlo otra vez (None si hay que pedirlo)."""
+    if time.time() - prev.get("ts", 0) > STATE_ODDS_MAX_AGE or near_kickoff(kickoff_utc, now_utc):
+        return None
+    return prev["odds"].get(str(fid))
+
+def iter_incremental(sport, day, prev, items, odds_map, analyze_batch, chunk=STREAM_CHUNK,
+                     partial=False, cancel=None):
+    """
+    items: [(fid, kickoff_utc, item)]; analyze_batch([(item, odds)]) -> [[picks]].
+    Versión streaming: emite (fid, picks) conforme están listos. Primero los
+    partidos cuyo 'update' de momios no cambió respecto a `prev` (y no empiezan
+    pronto), reutilizando los picks guardados; después el resto, recalculado en
+    lotes de `chunk`. Al agotarse persiste el nuevo estado y deja en LAST_RUN
+    los picks previos y nuevos (main compara lo publicado).
+    partial=True (el deadline cortó descargas): los partidos sin momios o que
+    no llegaron en el slate conservan picks, momios y 'update' de `prev`, y la
+    corrida no cuenta para el diff (lo que faltó no es "fuera"). Si `cancel` (Event)
+    se activa, se deja de analizar y no se guarda nada: la corrida ya terminó.
+    """
+    now = datetime.now(timezone.utc)
+    picks_by_fid, updates, snapshot, kickoffs, pending = {}, {}, {}, {}, []
+    for fid, kickoff, item in items:
+        kickoffs[fid] = kickoff
+        key = str(fid)
+        if partial and odds_map.get(fid) is None and key in prev["picks"]:
+            picks_by_fid[fid] = prev["picks"][key]
+            updates[fid] = prev["odds_update"].get(key)
+            snapshot[fid] = prev["odds"].get(key) or []
+            continue
+        odds = odds_map.get(fid) or []
+        upd = odds_update_of(odds)
+        if (key in prev["picks"] and upd is not None
+                and prev["odds_update"].get(key) == upd and not near_kickoff(kickoff, now)):
+            picks_by_fid[fid] = prev["picks"][key]
+        else:
+            picks_by_fid[fid] = None
+            pending.append((fid, item, odds))
+        updates[fid] = upd
+        snapshot[fid] = odds
+    if partial:
+        seen = {str(fid) for fid in picks_by_fid}
+        for key, picks in prev["picks"].items():
+            if key in seen:
+                continue
+            fid = int(key) if key.isdigit() else key
+            picks_by_fid[fid] = picks
+            updates[fid] = prev["odds_update"].get(key)
+            snapshot[fid] = prev["odds"].get(key) or []
+            ko = prev["kickoffs"].get(key)
+            kickoffs[fid] = datetime.fromisoformat(ko) if ko else (picks[0].kickoff if picks else None)
+    for fid, picks in picks_by_fid.items():
+        if picks is not None:
+            yield fid, picks
+    chunk = max(1, chunk or len(pending))
+    for i in range(0, len(pending), chunk):
+        if cancel is not None and cancel.is_set():
+            return
+        part = pending[i:i + chunk]
+        fresh = analyze_batch([(item, odds) for _, item, odds in part])
+        for (fid, _, _), picks in zip(part, fresh):
+            picks_by_fid[fid] = picks
+            yield fid, picks
+    if cancel is not None and cancel.is_set():
+        return
+    record_run(sport, day, prev["picks"] if prev.get("ts") and not partial else None, picks_by_fid)
+    save(sport, day, updates, snapshot, picks_by_fid, {k: v for k, v in kickoffs.items() if v is not None})
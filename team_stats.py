@@ -0,0 +1,189 @@
+# =======================
+# SERPICKS – TEAM FORM STORE
+# =======================
+import json, os, sys, tempfile, threading
+from datetime import datetime, timedelta, timezone
+import http_client, history
+from config import API_FOOTBALL_KEY, STATE_DIR, CACHE_TTL_FIXTURES, TEAM_FORM_MATCHES, TEAM_STATS_FETCH_XG
+
+HEADERS_FOOTBALL = {
+    "x-rapidapi-key": API_FOOTBALL_KEY,
+    "x-rapidapi-host": "api-football-v1.p.rapidapi.com"
+}
+BASE = "https://api-football-v1.p.rapidapi.com/v3"
+FINISHED = "FT-AET-PEN"
+
+# Store en disco:
+# {"teams":   {team_id: {fixture_id: {"date", "gf", "ga", "xg"}}},
+#  "leagues": {"league-season": "YYYY-MM-DD"},   <- última fecha sincronizada
+#  "backfill": {team_id: "YYYY-MM-DD"}}          <- último /fixtures?team=&last=N
+_PATH = os.path.join(STATE_DIR, "team_stats.json")
+_store = None
+_lock = threading.Lock()
+
+def _load():
+    global _store
+    if _store is None:
+        try:
+            with open(_PATH, encoding="utf-8") as fh:
+                _store = json.load(fh)
+        except Exception:
+            _store = {}
+        _store.setdefault("teams", {})
+        _store.setdefault("leagues", {})
+        _store.setdefault("backfill", {})
+    return _store
+
+def _save():
+    try:
+        os.makedirs(STATE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=STATE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(_store, fh)
+        os.replace(tmp, _PATH)
+    except Exception:
+        pass
+
+def regular_time_score(f):
+    """
+    (goles local, goles visita) a los 90 minutos de un partido de /fixtures.
+    Con prórroga o penales `goals` incluye el tiempo extra, así que se usa
+    score.fulltime; None si falta.
+    """
+    status = f.get("fixture", {}).get("status", {}).get("short")
+    score = f.get("goals") if status == "FT" else (f.get("score") or {}).get("fulltime")
+    if not score or score.get("home") is None or score.get("away") is None:
+        return None
+    return score["home"], score["away"]
+
+def _add_result(f):
+    """Registra un partido terminado (respuesta de /fixtures) para ambos equipos."""
+    score = regular_time_score(f)
+    if score is None:
+        return None
+    gh, ga = score
+    fid = str(f["fixture"]["id"])
+    date = f["fixture"]["date"]
+    try:
+        history.record_result("football", f["fixture"]["id"], gh, ga)
+    except Exception:
+        pass
+    teams = _store["teams"]
+    new = False
+    for side, other, gf, gc in (("home", "away", gh, ga), ("away", "home", ga, gh)):
+        tid = str(f["teams"][side]["id"])
+        rows = teams.setdefault(tid, {})
+        if fid not in rows:
+            rows[fid] = {"date": date, "gf": gf, "ga": gc, "xg": None}
+            new = True
+    return fid if new else None
+
+def _get(path, params):
+    return http_client.get_json(f"{BASE}/{path}", headers=HEADERS_FOOTBALL, params=params,
+                                ttl=CACHE_TTL_FIXTURES).get("response", [])
+
+def _league_results(key):
+    league, season, since, until = key
+    return _get("fixtures", {"league": league, "season": season, "from": since,
+                             "to": until, "status": FINISHED})
+
+def _team_last(team_id):
+    return _get("fixtures", {"team": team_id, "last": TEAM_FORM_MATCHES, "status": FINISHED})
+
+def _fixture_xg(fixture_id):
+    out = {}
+    for row in _get("fixtures/statistics", {"fixture": fixture_id}):
+        for st in row.get("statistics", []):
+            if st.get("type") == "expected_goals" and st.get("value") is not None:
+                try:
+                    out[str(row["team"]["id"])] = float(st["value"])
+                except Exception:
+                    pass
+    return out
+
+def sync(fixtures):
+    """
+    Actualiza la forma de todos los equipos del slate con pocas peticiones:
+    - una consulta por (liga, temporada) con los resultados desde la última
+      sincronización (no una por equipo);
+    - /fixtures?team=&last=N solo para equipos sin historial suficiente;
+    - opcional (SERPICKS_FETCH_XG=1): estadísticas de los partidos nuevos para xG real.
+    Peticiones deduplicadas y en paralelo; si algo falla se usa lo guardado.
+    """
+    with _lock:
+        _load()
+        today = datetime.now(timezone.utc).date()
+        fresh = set()
+
+        leagues = {}
+        for f in fixtures:
+            lg = f.get("league", {})
+            if lg.get("id") is not None and lg.get("season") is not None:
+                leagues[(lg["id"], lg["season"])] = True
+        keys = []
+        for league, season in leagues:
+            since = _store["leagues"].get(f"{league}-{season}")
+            if since is None or since < today.isoformat():
+                since = since or (today - timedelta(days=30)).isoformat()
+                keys.append((league, season, since, today.isoformat()))
+        for key, rows in http_client.fetch_many(_league_results, keys).items():
+            if rows is None:
+                print(f"WARN forma: liga {key[0]} sin actualizar", file=sys.stderr)
+                continue
+            for r in rows:
+                fresh.add(_add_result(r))
+            _store["leagues"][f"{key[0]}-{key[1]}"] = key[3]
+
+        team_ids = {str(f["teams"][s]["id"]) for f in fixtures for s in ("home", "away")}
+        thin = [t for t in team_ids if len(_store["teams"].get(t, {})) < TEAM_FORM_MATCHES
+                and _store["backfill"].get(t) != today.isoformat()]
+        for tid, rows in http_client.fetch_many(_team_last, thin).items():
+            if rows is None:
+                continue
+            for r in rows:
+                fresh.add(_add_result(r))
+            _store["backfill"][tid] = today.isoformat()
+
+        if TEAM_STATS_FETCH_XG:
+            wanted = set()
+            for t in team_ids:
+                for fid in _recent(t):
+                    if not _store["teams"][t][fid].get("xg_done"):
+                        wanted.add(fid)
+            for fid, xg in http_client.fetch_many(_fixture_xg, sorted(wanted)).items():
+                if xg is None:
+                    continue
+                for tid, rows in _store["teams"].items():
+                    if fid in rows:
+                        rows[fid]["xg"] = xg.get(tid)
+                        rows[fid]["xg_done"] = True
+
+        _save()
+        fresh.discard(None)
+        return len(fresh)
+
+def _recent(team_id, before=None):
+    rows = _store["teams"].get(str(team_id), {})
+    fids = [fid for fid in rows if before is None or rows[fid]["date"] < before]
+    return sorted(fids, key=lambda fid: rows[fid]["date"], reverse=True)[:TEAM_FORM_MATCHES]
+
+def recent_stats(team_id, before=None):
+    """
+    {"xg_recent", "gf5", "ga5"} de los últimos TEAM_FORM_MATCHES partidos
+    (gf5/ga5 escalados a 5 partidos); `before` (ISO) limita a partidos
+    anteriores, para backtests sin mirar al futuro. None si no hay historial.
+    """
+    _load()
+    fids = _recent(team_id, before)
+    if not fids:
+        return None
+    rows = [_store["teams"][str(team_id)][fid] for fid in fids]
+    n = len(rows)
+    gf = sum(r["gf"] for r in rows)
+    ga = sum(r["ga"] for r in rows)
+    xgs = [r["xg"] for r in rows if r.get("xg") is not None]
+    return {
+        "xg_recent": sum(xgs) / len(xgs) if xgs else gf / n,
+        "gf5": gf * 5.0 / n,
+        "ga5": ga * 5.0 / n,
+    }
@@ -1,7 +1,10 @@
 # =======================
 # SERPICKS – UTILS
 # =======================
+import zoneinfo
+from functools import lru_cache
 from math import isfinite
+from datetime import date, datetime, time, timedelta, timezone
 
 def decimal_to_american(dec):
     try:
@@ -51,4 +54,40 @@ def label_edge(e):
     return "Sin valor"
 
 def clamp(n, lo, hi):
-    return max(lo, min(hi, n))
\ No newline at end of file
+    return max(lo, min(hi, n))
+
+@lru_cache(maxsize=None)
+def local_tz(name=None):
+    """ZoneInfo de `name` (default config.TIMEZONE), resuelto una sola vez por proceso."""
+    if name is None:
+        from config import TIMEZONE
+        name = TIMEZONE
+    return zoneinfo.ZoneInfo(name)
+
+def as_date(day, tz):
+    """Acepta date, 'YYYY-MM-DD' o None (= hoy en `tz`)."""
+    if day is None:
+        return datetime.now(tz).date()
+    if isinstance(day, datetime):
+        return day.astimezone(tz).date()
+    if isinstance(day, date):
+        return day
+    return date.fromisoformat(str(day))
+
+def utc_window_for_local_day(day, tz):
+    """
+    Ventana [inicio, fin) en UTC del día local `day` en `tz`, más la lista
+    de fechas UTC que toca (1 o 2: un kickoff después de la medianoche UTC
+    puede seguir siendo "hoy" en México).
+    """
+    start = datetime.combine(day, time.min, tzinfo=tz).astimezone(timezone.utc)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz).astimezone(timezone.utc)
+    days, d = [], start.date()
+    while d <= (end - timedelta(microseconds=1)).date():
+        days.append(d)
+        d += timedelta(days=1)
+    return start, end, days
+
+def parse_api_dt(dt_str):
+    """ISO de API-Sports ('...Z' o con offset) -> datetime tz-aware."""
+    return datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
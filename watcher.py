@@ -0,0 +1,193 @@
+# =======================
+# SERPICKS – ODDS WATCHER
+# =======================
+# Vigila los momios de los picks publicados del día (el mismo top
+# MAX_PICKS_PER_DAY que arma main) después del análisis: sondea cada
+# partido según qué tan cerca está su kickoff, solo revalúa los mercados cuyo
+# precio se movió y avisa cuando un pick cruza MIN_EDGE_FOR_STRONG o pierde
+# el valor. El número de sondeos se ajusta al presupuesto de cuota RapidAPI.
+import sys, time
+from datetime import datetime, timedelta, timezone
+import http_client, metrics, ranking, state, sports
+from odds import OddsIndex
+from utils import label_edge
+from config import (
+    WATCH_TIERS, WATCH_BUDGET_PER_DAY, WATCH_QUOTA_RESERVE, WATCH_COALESCE_S, MIN_EDGE_FOR_STRONG,
+    MAX_PICKS_PER_DAY
+)
+
+RELOAD_EVERY_S = 600   # relee el estado (picks nuevos tras un recheck)
+
+def _sources():
+    """deporte (clave de estado) -> (nombre, url de cuota, fetch(fid) de momios frescos)."""
+    return {p.key: (p.name, p.quota_url, lambda fid, p=p: p.odds_one(fid, ttl=WATCH_COALESCE_S))
+            for p in sports.enabled()}
+
+def parse_tiers(spec=WATCH_TIERS):
+    """'360:60,120:20,...' -> [(umbral_min, intervalo_min)] de mayor a menor umbral."""
+    tiers = []
+    for item in spec.split(","):
+        item = item.strip()
+        if item:
+            th, iv = item.split(":")
+            tiers.append((float(th), float(iv)))
+    return sorted(tiers, reverse=True)
+
+def poll_interval(minutes_to_kickoff, tiers):
+    """Segundos hasta el siguiente sondeo: más seguido conforme se acerca el kickoff."""
+    for th, iv in tiers:
+        if minutes_to_kickoff >= th:
+            return iv * 60
+    return tiers[-1][1] * 60
+
+class _Budget:
+    """Token bucket: WATCH_BUDGET_PER_DAY repartido en el día, con ráfaga de hasta una hora."""
+    def __init__(self, per_day):
+        self.rate = per_day / 86400.0
+        self.cap = max(1.0, per_day / 24.0)
+        self.tokens = self.cap
+        self.t = time.monotonic()
+
+    def take(self, n):
+        now = time.monotonic()
+        self.tokens = min(self.cap, self.tokens + (now - self.t) * self.rate)
+        self.t = now
+        k = min(n, int(self.tokens))
+        self.tokens -= k
+        return k
+
+class _Watched:
+    __slots__ = ("sport", "fid", "kickoff", "picks", "edges", "next_poll")
+
+    def __init__(self, sport, fid, kickoff, now):
+        self.sport, self.fid, self.kickoff = sport, fid, kickoff
+        self.picks, self.edges = {}, {}
+        self.next_poll = now
+
+class Watcher:
+    def __init__(self, day, notify):
+        self.day = day
+        self.notify = notify
+        self.tiers = parse_tiers()
+        self.budget = _Budget(WATCH_BUDGET_PER_DAY)
+        self.sources = _sources()
+        self.watched = {}
+        self.alerted = {}    # (deporte, fid, mercado, resultado) -> "strong" | "lost"
+        self.stats = {"polls": 0, "moved": 0, "alerts": 0}
+
+    def load(self):
+        """
+        (Re)carga los picks publicados del día desde el estado del último
+        análisis: se rankean todos los deportes con el mismo top-K de main y
+        solo se vigilan esos (de los partidos que aún no empiezan).
+        """
+        now = datetime.now(timezone.utc)
+        groups, kickoffs = [], {}
+        for sport in self.sources:
+            st = state.load(sport, self.day)
+            picks = []
+            for key, ps in st["picks"].items():
+                if not ps:
+                    continue
+                ko = st["kickoffs"].get(key)
+                kickoffs[(sport, ps[0].fixture_id)] = datetime.fromisoformat(ko) if ko else ps[0].kickoff
+                picks.extend(ps)
+            groups.append((sport, picks))
+        published = {}
+        for sport, p in ranking.merge_top(groups, MAX_PICKS_PER_DAY):
+            ko = kickoffs[(sport, p.fixture_id)]
+            if ko is not None and ko > now:
+                published.setdefault((sport, p.fixture_id), (ko, []))[1].append(p)
+        for key in [k for k in self.watched if k not in published]:
+            del self.watched[key]
+        for (sport, fid), (ko, picks) in published.items():
+            w = self.watched.get((sport, fid))
+            if w is None:
+                w = self.watched[(sport, fid)] = _Watched(sport, fid, ko, now)
+            w.picks = {(p.market, p.outcome): p for p in picks}
+            for mk, p in w.picks.items():
+                w.edges.setdefault(mk, (p.odds_dec, p.edge))
+        return len(self.watched)
+
+    def _quota_low(self):
+        for _, url, _ in self.sources.values():
+            left = metrics.quota_remaining(url)
+            if left is not None and left < WATCH_QUOTA_RESERVE:
+                return True
+        return False
+
+    def _reprice(self, w, idx):
+        """Solo mercados cuyo precio cambió: nuevo edge con la prob. del modelo guardada."""
+        name = self.sources[w.sport][0]
+        lines = []
+        for mk, p in w.picks.items():
+            dec = idx.price(*mk)
+            old_dec, old_edge = w.edges[mk]
+            if not dec or dec == old_dec:
+                continue
+            self.stats["moved"] += 1
+            new_edge = p.edge_at(dec)
+            w.edges[mk] = (dec, new_edge)
+            if new_edge is None or old_edge is None:
+                continue
+            akey = (w.sport, w.fid) + mk
+            if old_edge < MIN_EDGE_FOR_STRONG <= new_edge and self.alerted.get(akey) != "strong":
+                self.alerted[akey] = "strong"
+                icon = "📈"
+            elif old_edge > 0 >= new_edge and self.alerted.get(akey) != "lost":
+                self.alerted[akey] = "lost"
+                icon = "📉"
+            else:
+                if 0 < new_edge < MIN_EDGE_FOR_STRONG:
+                    self.alerted.pop(akey, None)   # volvió a la zona normal: puede volver a avisar
+                continue
+            lines.append(f"{icon} {name} — {p.home} vs {p.away} | {p.type}\n"
+                         f"   Momio {old_dec} → {dec} | Edge {old_edge*100:.1f}% → {new_edge*100:.1f}% "
+                         f"({label_edge(new_edge)})")
+        return lines
+
+    def tick(self):
+        """Un lote de sondeos: los partidos que tocan (o tocarán en WATCH_COALESCE_S) van juntos."""
+        now = datetime.now(timezone.utc)
+        for key in [k for k, w in self.watched.items() if w.kickoff <= now]:
+            del self.watched[key]
+        horizon = now + timedelta(seconds=WATCH_COALESCE_S)
+        due = sorted((w for w in self.watched.values() if w.next_poll <= horizon), key=lambda w: w.kickoff)
+        if not due:
+            return []
+        if self._quota_low():
+            print("WARN watcher: cuota RapidAPI baja, se pausan los sondeos", file=sys.stderr)
+            for w in due:
+                w.next_poll = now + timedelta(minutes=15)
+            return []
+        n = self.budget.take(len(due))
+        for w in due[n:]:                      # sin presupuesto: primero los que empiezan antes
+            w.next_poll = now + timedelta(seconds=WATCH_COALESCE_S)
+        due = due[:n]
+        results = http_client.fetch_many(lambda w: self.sources[w.sport][2](w.fid), due)
+        self.stats["polls"] += len(due)
+        lines = []
+        for w in due:
+            minutes = (w.kickoff - now).total_seconds() / 60
+            w.next_poll = now + timedelta(seconds=poll_interval(minutes, self.tiers))
+            if results.get(w):
+                lines += self._reprice(w, OddsIndex(results[w]))
+        if lines:
+            self.stats["alerts"] += len(lines)
+            self.notify(f"🔔 SERPICKS – Movimiento de momios ({self.day.isoformat()})\n" + "\n".join(lines))
+        return lines
+
+    def run(self, stop):
+        """Sondea hasta que todos los partidos vigilados empiecen (o `stop`)."""
+        next_load = 0.0
+        while not stop.is_set():
+            if time.monotonic() >= next_load:
+                self.load()
+                next_load = time.monotonic() + RELOAD_EVERY_S
+            self.tick()
+            if not self.watched:
+                break
+            now = datetime.now(timezone.utc)
+            wake = min(w.next_poll for w in self.watched.values())
+            stop.wait(min(60.0, max(5.0, (wake - now).total_seconds())))
+        return self.stats